@@ -3,12 +3,17 @@
 AI-IDS Professional Email Alert System
 Sends detailed, professional email alerts ONLY for newly detected attacks
 """
-import smtplib, json, time
+import smtplib, json, time, os
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from datetime import datetime
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 BASE_DIR = Path('/home/aashish/AI-IDS-Project')
 CONFIG_FILE = BASE_DIR / 'config' / 'email_config.json'
 
@@ -315,7 +320,7 @@ class EmailAlerter:
                 server.send_message(msg)
             
             self.last_sent[label] = now
-            ts = datetime.fromisoformat(attack['timestamp']).strftime('%H:%M:%S')
+            ts = attack.get('hms') or attack['timestamp'][11:19]
             print(f"✅ [{threat_level}] Email sent: {label} @ {ts} → {self.config['recipient_email']}")
             return True
             
@@ -326,18 +331,46 @@ class EmailAlerter:
 class AlertMonitor:
     def __init__(self):
         self.emailer = EmailAlerter()
-        self.shared_file = BASE_DIR / 'data' / 'live_results.json'
+        self.shared_file = BASE_DIR / 'data' / 'live_results.jsonl'
         self.running = True
-        self.last_alert_count = 0
+        self.offset = 0
+        self.inode = None
+        self.last_timestamp = ''
         
-        # Initialize: count existing alerts so we don't email about them
+        # Initialize: skip existing alerts so we don't email about them
         try:
-            with open(self.shared_file, 'r') as f:
-                data = json.load(f)
-            self.last_alert_count = len(data.get('alerts', []))
-            print(f"📋 Found {self.last_alert_count} existing alerts (will NOT email about these)")
-        except:
-            self.last_alert_count = 0
+            existing = self.read_new_alerts()
+            print(f"📋 Found {len(existing)} existing alerts (will NOT email about these)")
+        except FileNotFoundError:
+            pass
+    
+    def read_new_alerts(self):
+        """Return alerts appended to the NDJSON feed since the last call.
+        
+        Follows the file by byte offset; when the capture process compacts it
+        (new inode or shorter file) re-scan from the start and rely on the
+        timestamp watermark so nothing is emailed twice.
+        """
+        st = os.stat(self.shared_file)
+        if st.st_ino != self.inode or st.st_size < self.offset:
+            self.inode, self.offset = st.st_ino, 0
+        with open(self.shared_file, 'rb') as f:
+            f.seek(self.offset)
+            chunk = f.read()
+        end = chunk.rfind(b'\n') + 1  # leave a torn trailing line for next time
+        self.offset += end
+        
+        loads = orjson.loads if orjson is not None else json.loads
+        new_alerts = []
+        for line in chunk[:end].splitlines():
+            try:
+                event = loads(line)
+            except ValueError:
+                continue
+            if event.get('is_attack') and event['timestamp'] > self.last_timestamp:
+                new_alerts.append(event)
+                self.last_timestamp = event['timestamp']
+        return new_alerts
     
     def start(self):
         if not self.emailer.enabled:
@@ -357,18 +390,9 @@ class AlertMonitor:
         
         while self.running:
             try:
-                with open(self.shared_file, 'r') as f:
-                    data = json.load(f)
-                
-                alerts = data.get('alerts', [])
-                current_count = len(alerts)
-                
                 # Only process NEW alerts
-                if current_count > self.last_alert_count:
-                    new_alerts = alerts[self.last_alert_count:]
-                    for alert in new_alerts:
-                        self.emailer.send_alert(alert)
-                    self.last_alert_count = current_count
+                for alert in self.read_new_alerts():
+                    self.emailer.send_alert(alert)
                 
                 time.sleep(5)
                 
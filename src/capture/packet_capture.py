@@ -9,29 +9,41 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from scapy.all import sniff, IP, TCP, UDP, Raw
 import pickle, json, time, argparse, os
+import atexit
+import joblib
 from collections import defaultdict, deque
 from datetime import datetime
 import numpy as np
 from colorama import Fore, Style, init
 
 # Database integration
+alert_writer = None
 try:
-    from database import save_alert, init_database
+    from database import AlertWriter, init_database
     DATABASE_ENABLED = True
     init_database()  # Initialize database on startup
 except Exception as e:
     print(f"{Fore.YELLOW}⚠️  Database not available: {e}")
     DATABASE_ENABLED = False
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 init(autoreset=True)
 
 # Base directory
 BASE_DIR = Path('/home/aashish/AI-IDS-Project')
 MODEL_PATH = BASE_DIR / 'models' / 'final_model.pkl'
-SCALER_PATH = BASE_DIR / 'data' / 'processed' / 'scaler.pkl'
-LABEL_ENCODER_PATH = BASE_DIR / 'data' / 'processed' / 'label_encoder.pkl'
+SCALER_PATH = BASE_DIR / 'data' / 'processed' / 'scaler.npz'
+LEGACY_SCALER_PATH = BASE_DIR / 'data' / 'processed' / 'scaler.pkl'
+METADATA_PATH = BASE_DIR / 'data' / 'processed' / 'metadata.json'
 FEATURE_NAMES_PATH = BASE_DIR / 'data' / 'processed' / 'feature_names.json'
-SHARED_FILE = BASE_DIR / 'data' / 'live_results.json'
+SHARED_FILE = BASE_DIR / 'data' / 'live_results.jsonl'  # one JSON event per line
+SHARED_MAX_BYTES = 4 * 1024 * 1024   # compact the feed once it grows past this
+SHARED_MAX_TRAFFIC = 1000  # newest events compaction keeps per kind
+SHARED_MAX_ALERTS = 500    # (the dashboard shows at most this many)
 
 # Behavioral detection trackers
 ddos_tracker = defaultdict(lambda: {'packets': deque(maxlen=100), 'last_seen': 0})
@@ -48,20 +60,27 @@ def load_model_components():
     """Load ML model and preprocessing components"""
     print(f"{Fore.YELLOW}Loading model components...")
     
-    with open(MODEL_PATH, 'rb') as f:
-        model = pickle.load(f)
+    model = joblib.load(MODEL_PATH)  # also reads models saved with plain pickle
     
-    with open(SCALER_PATH, 'rb') as f:
-        scaler = pickle.load(f)
+    # StandardScaler state as (mean, 1/scale), applied without sklearn
+    if SCALER_PATH.exists():
+        with np.load(SCALER_PATH) as s:
+            mean, scale = s['mean'], s['scale']
+    else:  # data processed before scaler.npz existed
+        with open(LEGACY_SCALER_PATH, 'rb') as f:
+            legacy = pickle.load(f)
+        mean, scale = legacy.mean_, legacy.scale_
+    scaler = (mean, 1.0 / scale)
     
-    with open(LABEL_ENCODER_PATH, 'rb') as f:
-        label_encoder = pickle.load(f)
+    # Encoded label i is class_names[i] (LabelEncoder sorts its classes)
+    with open(METADATA_PATH, 'r') as f:
+        class_names = json.load(f)['class_names']
     
     with open(FEATURE_NAMES_PATH, 'r') as f:
         feature_names = json.load(f)
     
     print(f"{Fore.GREEN}✅ Model loaded: {len(feature_names)} features\n")
-    return model, scaler, label_encoder, feature_names
+    return model, scaler, class_names, feature_names
 
 def check_ssh_brute_force(pkt):
     """Detect SSH brute force - multiple connection attempts to port 22"""
@@ -232,41 +251,54 @@ def extract_features(pkt):
     
     return np.array(features).reshape(1, -1)
 
+def compact_shared():
+    """Rewrite the shared feed keeping the newest SHARED_MAX_TRAFFIC traffic and
+    SHARED_MAX_ALERTS alert lines, however sparse the alerts are"""
+    with open(SHARED_FILE, 'rb') as f:
+        lines = f.read().split(b'\n')
+    loads = orjson.loads if orjson is not None else json.loads
+    room = {False: SHARED_MAX_TRAFFIC, True: SHARED_MAX_ALERTS}
+    kept = []
+    for line in reversed(lines):
+        if not line:
+            continue
+        try:
+            is_attack = bool(loads(line).get('is_attack'))
+        except ValueError:
+            continue
+        if room[is_attack]:
+            room[is_attack] -= 1
+            kept.append(line)
+            if not any(room.values()):
+                break
+    tmp = SHARED_FILE.with_suffix('.tmp')
+    with open(tmp, 'wb') as f:
+        f.write(b''.join(line + b'\n' for line in reversed(kept)))
+    os.replace(tmp, SHARED_FILE)  # readers never see a half-written file
+
 def save_to_shared(data):
-    """Save detection results to shared JSON file and database"""
+    """Append detection results to the shared NDJSON feed and database"""
     global attack_count
     
-    # Save to JSON file (for dashboard compatibility)
-    try:
-        with open(SHARED_FILE, 'r') as f:
-            shared = json.load(f)
-    except:
-        shared = {"traffic": [], "alerts": []}
-    
-    # Add to appropriate list
     if 'is_attack' in data and data['is_attack']:
-        shared['alerts'].append(data)
         attack_count += 1
         
-        # Save to database
-        if DATABASE_ENABLED:
-            try:
-                alert_id = save_alert(data)
-                if alert_id:
-                    print(f"{Fore.GREEN}   💾 Saved to database (ID: {alert_id})")
-            except Exception as e:
-                print(f"{Fore.YELLOW}   ⚠️  Database save failed: {e}")
-    else:
-        shared['traffic'].append(data)
+        # Queue for the database; the writer thread commits in batches
+        if alert_writer is not None and not alert_writer.put(data):
+            print(f"{Fore.YELLOW}   ⚠️  Database queue full, alert not saved")
     
-    # Keep only recent data
-    shared['alerts'] = shared['alerts'][-500:]
-    shared['traffic'] = shared['traffic'][-1000:]
+    # Append-only: O(1) per event instead of re-reading and rewriting the file
+    if orjson is not None:
+        line = orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE)
+    else:
+        line = (json.dumps(data) + '\n').encode()
+    with open(SHARED_FILE, 'ab') as f:
+        f.write(line)
     
-    with open(SHARED_FILE, 'w') as f:
-        json.dump(shared, f, indent=2)
+    if SHARED_FILE.stat().st_size > SHARED_MAX_BYTES:
+        compact_shared()
 
-def process_packet(pkt, model, scaler, label_encoder):
+def process_packet(pkt, model, scaler, class_names):
     """Process packet with hybrid detection"""
     global total_packets
     total_packets += 1
@@ -295,6 +327,7 @@ def process_packet(pkt, model, scaler, label_encoder):
         
         alert_data = {
             'timestamp': now,
+            'hms': now[11:19],  # display time, so readers never re-parse the timestamp
             'label': attack_type,
             'confidence': 98,  # Behavioral rules are high confidence
             'src_ip': src_ip,
@@ -319,17 +352,19 @@ def process_packet(pkt, model, scaler, label_encoder):
     if total_packets % 10 == 0:  # ML every 10th packet to save resources
         try:
             features = extract_features(pkt)
-            features_scaled = scaler.transform(features)
+            mean, inv_scale = scaler
+            features_scaled = (features - mean) * inv_scale
             
             prediction = model.predict(features_scaled)[0]
             proba = model.predict_proba(features_scaled)[0]
             confidence = int(max(proba) * 100)
-            label = label_encoder.inverse_transform([prediction])[0]
+            label = class_names[prediction]
             
             # Only alert if not BENIGN and confidence > 75%
             if label != 'BENIGN' and confidence > 75:
                 alert_data = {
                     'timestamp': now,
+                    'hms': now[11:19],
                     'label': label,
                     'confidence': confidence,
                     'src_ip': src_ip,
@@ -365,6 +400,7 @@ def process_packet(pkt, model, scaler, label_encoder):
         save_to_shared(traffic_data)
 
 def main():
+    global alert_writer
     parser = argparse.ArgumentParser(description='AI-IDS Real-time Packet Capture with Database')
     parser.add_argument('--iface', type=str, default='eth0', help='Network interface')
     parser.add_argument('--filter', type=str, default='', help='BPF filter')
@@ -382,24 +418,36 @@ def main():
         print(f"{Fore.RED}  Database: ❌ Disabled")
     print(f"{Fore.CYAN}{'='*70}\n")
     
-    model, scaler, label_encoder, feature_names = load_model_components()
+    model, scaler, class_names, feature_names = load_model_components()
+    
+    if DATABASE_ENABLED:
+        alert_writer = AlertWriter()
+        # Alerts queued when the process exits some other way still get written
+        atexit.register(alert_writer.close)
     
     print(f"{Fore.GREEN}🎯 Monitoring started. Press Ctrl+C to stop.\n")
     
+    # sniff() swallows Ctrl+C and returns normally, so flush on every exit
     try:
         sniff(
             iface=args.iface,
-            prn=lambda pkt: process_packet(pkt, model, scaler, label_encoder),
+            prn=lambda pkt: process_packet(pkt, model, scaler, class_names),
             filter=args.filter,
             store=False
         )
     except KeyboardInterrupt:
+        pass
+    finally:
+        if alert_writer is not None:
+            alert_writer.close()
         print(f"\n\n{Fore.CYAN}{'='*70}")
         print(f"{Fore.YELLOW}📊 Session Summary:")
         print(f"{Fore.GREEN}   Total Packets: {total_packets:,}")
         print(f"{Fore.RED}   Attacks Detected: {attack_count}")
         if DATABASE_ENABLED:
-            print(f"{Fore.GREEN}   Database: All attacks saved to SQLite")
+            print(f"{Fore.GREEN}   Database: {alert_writer.written} attacks saved to SQLite")
+            if alert_writer.dropped:
+                print(f"{Fore.YELLOW}   Database: {alert_writer.dropped} attacks could not be saved")
         print(f"{Fore.CYAN}{'='*70}\n")
 
 if __name__ == "__main__":
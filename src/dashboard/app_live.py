@@ -3,19 +3,61 @@
 AI-IDS Professional SIEM Dashboard - Enhanced Neon Edition
 Features: Attack Heatmap, Inline CVE Mapping, Real-time monitoring
 """
-import json, os, time, psutil, sys
+import json, os, time, psutil, sys, hashlib, csv, io, threading, gzip
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import datetime, date, timedelta
+from functools import lru_cache
 from collections import Counter, defaultdict
-from flask import Flask, jsonify, send_from_directory, Response
+from flask import Flask, jsonify, send_from_directory, send_file, Response, request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    from flask_compress import Compress
+except ImportError:
+    Compress = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+class OrjsonProvider(DefaultJSONProvider):
+    """jsonify() backed by orjson; response bodies are emitted as bytes directly"""
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS), mimetype='application/json')
 
 app = Flask(__name__)
+if orjson is not None:
+    app.json = OrjsonProvider(app)
+
+# Gzip JSON/HTML/CSV responses (the dashboard payload is highly repetitive)
+app.config['COMPRESS_MIMETYPES'] = ['application/json', 'text/html', 'text/csv']
+app.config['COMPRESS_LEVEL'] = 4
+if Compress is not None:
+    Compress(app)
 
 BASE_DIR = Path('/home/aashish/AI-IDS-Project')
-SHARED_FILE = BASE_DIR / 'data' / 'live_results.json'
+SHARED_FILE = BASE_DIR / 'data' / 'live_results.jsonl'  # NDJSON feed written by packet_capture
+SHARED_TAIL_BYTES = 512 * 1024  # feed is read backwards in blocks of this size
+SHARED_MAX_TRAFFIC = 1000  # newest events kept per list (~170 B per traffic line,
+SHARED_MAX_ALERTS = 500    # ~330 B per alert line: one block usually covers both)
 REPORTS_DIR = BASE_DIR / 'reports'
 REPORTS_DIR.mkdir(exist_ok=True)
+
+# report_generator sits next to this file; it is imported lazily on first use
+# (it pulls in matplotlib), so only its path is registered here, once
+if str(Path(__file__).parent) not in sys.path:
+    sys.path.insert(0, str(Path(__file__).parent))
+
 START_TIME = time.time()
+RATE_WINDOW_SECONDS = 300  # attack rate / threat level look at the last 5 minutes
 
 # Expanded CVE Database - Maps ALL attack types to relevant CVEs
 CVE_DATABASE = {
@@ -60,39 +102,182 @@ CVE_DATABASE = {
     'BENIGN': []
 }
 
-def read_shared():
+# Parsed tail of live_results.jsonl plus rolling aggregates over it, keyed on
+# (mtime_ns, size); callers treat both as read-only. "bodies" holds JSON
+# responses already serialized from this snapshot (see cached_body)
+_SHARED_CACHE = {"key": None, "data": {"traffic": [], "alerts": []}, "stats": None, "bodies": {}}
+_SHARED_LOCK = threading.Lock()
+
+def _new_stats():
+    return {'total_packets': 0, 'type_counts': Counter(), 'heatmap': [[0 for _ in range(24)] for _ in range(7)]}
+
+def _copy_stats(stats):
+    return {
+        'total_packets': stats['total_packets'],
+        'type_counts': Counter(stats['type_counts']),
+        'heatmap': [row[:] for row in stats['heatmap']]
+    }
+
+def _count_traffic(stats, rows, sign):
+    stats['total_packets'] += sign * sum(t['fwd_pkts'] + t['bwd_pkts'] for t in rows)
+
+@lru_cache(maxsize=32)
+def _weekday(day):
+    """Weekday of a 'YYYY-MM-DD' string; alerts share few distinct days"""
+    return date.fromisoformat(day).weekday()
+
+def _count_alerts(stats, rows, sign):
+    # Timestamps are isoformat() strings: slice the hour, parse only the date
+    for alert in rows:
+        ts = alert['timestamp']
+        stats['type_counts'][alert['label']] += sign
+        stats['heatmap'][_weekday(ts[:10])][int(ts[11:13])] += sign
+
+def _window_delta(old, new):
+    """Split a sliding-window update into (dropped, added) rows.
+
+    The capture process appends to each list and trims it from the head, so
+    the new list is normally old[k:] + added. Returns None when it isn't
+    (file replaced or rewritten) and the caller has to recount.
+    """
+    if not old:
+        return [], new
+    last = old[-1]
+    for j in range(len(new) - 1, -1, -1):
+        if new[j] == last:
+            kept = j + 1
+            if kept > len(old) or new[0] != old[len(old) - kept]:
+                return None
+            return old[:len(old) - kept], new[kept:]
+    return None
+
+def _roll_stats(stats, old, new):
+    """Move the aggregates from the old snapshot to the new one in O(changed rows)"""
+    deltas = [_window_delta(old.get(k, []), new.get(k, [])) for k in ('traffic', 'alerts')]
+    if stats is None or None in deltas:
+        stats = _new_stats()
+        deltas = [([], new.get('traffic', [])), ([], new.get('alerts', []))]
+    else:
+        stats = _copy_stats(stats)  # readers may still hold the previous dict
+    (t_dropped, t_added), (a_dropped, a_added) = deltas
+    _count_traffic(stats, t_dropped, -1)
+    _count_traffic(stats, t_added, 1)
+    _count_alerts(stats, a_dropped, -1)
+    _count_alerts(stats, a_added, 1)
+    return stats
+
+def parse_shared_tail():
+    """Parse the feed from its end backwards into traffic/alerts lists.
+
+    Reading stops once both lists hold their cap (SHARED_MAX_TRAFFIC /
+    SHARED_MAX_ALERTS) or the file runs out, so sparse alerts are still
+    found while bytes read stay O(window) however long the capture has run.
+    """
+    loads = orjson.loads if orjson is not None else json.loads
+    traffic, alerts = [], []  # newest first while reading
     try:
-        with open(SHARED_FILE, 'r') as f:
-            return json.load(f)
-    except:
+        with open(SHARED_FILE, 'rb') as f:
+            pos = f.seek(0, os.SEEK_END)
+            carry = b''
+            while pos and (len(traffic) < SHARED_MAX_TRAFFIC or len(alerts) < SHARED_MAX_ALERTS):
+                step = min(SHARED_TAIL_BYTES, pos)
+                pos -= step
+                f.seek(pos)
+                lines = (f.read(step) + carry).split(b'\n')
+                # The first line may continue in the previous block
+                carry = lines.pop(0) if pos else b''
+                for line in reversed(lines):
+                    if not line:
+                        continue
+                    try:
+                        event = loads(line)
+                    except ValueError:
+                        continue  # torn line from an append in progress
+                    if event.get('is_attack'):
+                        if len(alerts) < SHARED_MAX_ALERTS:
+                            alerts.append(event)
+                    elif len(traffic) < SHARED_MAX_TRAFFIC:
+                        traffic.append(event)
+    except OSError:
         return {"traffic": [], "alerts": []}
+    return {"traffic": traffic[::-1], "alerts": alerts[::-1]}
 
-def get_threat_level():
-    data = read_shared()
-    alerts = data.get("alerts", [])
-    if not alerts:
-        return "LOW", "#22c55e"
-    now = datetime.now()
-    recent = [a for a in alerts if (now - datetime.fromisoformat(a['timestamp'])).seconds < 300]
-    if len(recent) > 20:
+def _read_snapshot():
+    """Return (data, stats, bodies) for the current file, re-parsing only when it changes"""
+    try:
+        st = os.stat(SHARED_FILE)
+    except OSError:
+        return {"traffic": [], "alerts": []}, _new_stats(), {}
+    key = (st.st_mtime_ns, st.st_size)
+    with _SHARED_LOCK:
+        if key == _SHARED_CACHE["key"]:
+            return _SHARED_CACHE["data"], _SHARED_CACHE["stats"], _SHARED_CACHE["bodies"]
+        data = parse_shared_tail()
+        stats = _roll_stats(_SHARED_CACHE["stats"], _SHARED_CACHE["data"], data)
+        _SHARED_CACHE["key"] = key
+        _SHARED_CACHE["data"] = data
+        _SHARED_CACHE["stats"] = stats
+        _SHARED_CACHE["bodies"] = {}
+        return data, stats, _SHARED_CACHE["bodies"]
+
+def read_shared_with_stats():
+    """Return (shared detection results, aggregates), re-parsing only when the file changes"""
+    return _read_snapshot()[:2]
+
+def read_shared():
+    """Return the shared detection results, re-parsing only when the file changes"""
+    return read_shared_with_stats()[0]
+
+def dumps_bytes(obj):
+    """Serialize obj to a JSON response body"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj).encode()
+
+def cached_body(name, stamp, build):
+    """JSON bytes of build(data, stats), serialized once per snapshot and `stamp`.
+
+    `stamp` covers inputs other than the file (e.g. the current minute); a
+    new stamp replaces the previous body for `name` instead of adding to it.
+    """
+    data, stats, bodies = _read_snapshot()
+    entry = bodies.get(name)
+    if entry is None or entry[0] != stamp:
+        entry = bodies[name] = (stamp, dumps_bytes(build(data, stats)))
+    return entry[1]
+
+def dashboard_body():
+    """Serialized /api/dashboard payload; its time axis only moves once a minute"""
+    return cached_body('dashboard', f"{datetime.now():%Y%m%d%H%M}", build_dashboard)
+
+def all_alerts_body():
+    """Serialized /api/all_alerts payload"""
+    return cached_body('all_alerts', None, lambda data, stats: build_all_alerts(data))
+
+def get_threat_level(recent_count):
+    """Map the number of alerts in the last 5 minutes to a threat level"""
+    if recent_count > 20:
         return "CRITICAL", "#dc2626"
-    elif len(recent) > 10:
+    elif recent_count > 10:
         return "HIGH", "#ef4444"
-    elif len(recent) > 5:
+    elif recent_count > 5:
         return "MEDIUM", "#f59e0b"
     return "LOW", "#22c55e"
 
-def generate_heatmap_data():
-    """Generate 24-hour attack heatmap data"""
-    data = read_shared()
-    alerts = data.get("alerts", [])
-    heatmap = [[0 for _ in range(24)] for _ in range(7)]
-    for alert in alerts:
-        dt = datetime.fromisoformat(alert['timestamp'])
-        day = dt.weekday()
-        hour = dt.hour
-        heatmap[day][hour] += 1
-    return heatmap
+def count_recent_alerts(alerts, now, window=RATE_WINDOW_SECONDS):
+    """Count alerts in the trailing window.
+
+    Alerts are appended in time order, so walk back from the newest and stop
+    at the first one outside the window - O(window), not O(history).
+    """
+    # isoformat() strings order like the datetimes they encode
+    cutoff = (now - timedelta(seconds=window)).isoformat()
+    count = 0
+    for alert in reversed(alerts):
+        if alert['timestamp'] < cutoff:
+            break
+        count += 1
+    return count
 
 def get_cves_for_attack(attack_type):
     """Get top 2 CVEs for an attack type"""
@@ -401,7 +586,7 @@ OVERVIEW_HTML = f'''<!DOCTYPE html>
 <div class="kpi-card red">
 <div class="kpi-label"><i class="fas fa-crosshairs"></i> THREATS DETECTED</div>
 <div class="kpi-value" id="attacksDetected">0</div>
-<div class="kpi-change" id="attackRate">0/min avg</div>
+<div class="kpi-change" id="attackRate">0/min (5m)</div>
 </div>
 </div>
 <div class="col-md-3">
@@ -479,12 +664,17 @@ const trafficChart=new Chart(trafficCtx,{{type:'line',data:{{labels:[],datasets:
 const distChart=new Chart(distCtx,{{type:'doughnut',data:{{labels:[],datasets:[{{data:[],backgroundColor:['#ff0080','#ffaa00','#bf00ff','#ff0055','#ff6400','#c800ff','#ff3296'],borderColor:['#ff0055','#ff8800','#9500cc','#cc0044','#ff4400','#aa00dd','#ff1177'],borderWidth:2}}]}},options:{{responsive:true,maintainAspectRatio:true,plugins:{{legend:{{position:'bottom',labels:{{color:'#cbd5e1',padding:10,font:{{size:10,weight:'bold'}}}}}}}}}}}});
 
 const heatmapChart=new Chart(heatmapCtx,{{type:'bar',data:{{labels:['Mon','Tue','Wed','Thu','Fri','Sat','Sun'],datasets:[]}},options:{{responsive:true,maintainAspectRatio:true,indexAxis:'y',plugins:{{legend:{{display:false}},tooltip:{{callbacks:{{title:function(ctx){{return['Mon','Tue','Wed','Thu','Fri','Sat','Sun'][ctx[0].dataIndex]+' '+ctx[0].dataset.label}},label:function(ctx){{return ctx.parsed.x+' attacks'}}}}}}}},scales:{{x:{{stacked:true,ticks:{{color:'#64748b'}},grid:{{color:'rgba(0,243,255,0.1)'}}}},y:{{stacked:true,ticks:{{color:'#64748b'}},grid:{{color:'rgba(0,243,255,0.1)'}}}}}}}}}});
+const heatColors=['#ff0055','#ff0080','#ff00aa','#ff00d4','#bf00ff','#9500cc','#6b00ff','#4400ff','#0040ff','#0080ff','#00aaff','#00d4ff','#00f3ff','#00ffd4','#00ffaa','#00ff80','#00ff40','#40ff00','#80ff00','#aaff00','#d4ff00','#ffff00','#ffd400','#ffaa00'];
+for(let h=0;h<24;h++){{heatmapChart.data.datasets.push({{label:(h<10?'0':'')+h+':00',data:new Array(7).fill(0),backgroundColor:heatColors[h],borderWidth:0}})}}
+function fillInPlace(dst,src){{dst.length=src.length;for(let i=0;i<src.length;i++)dst[i]=src[i]}}
 
-async function updateDashboard(){{try{{const res=await fetch('/api/dashboard');const data=await res.json();document.getElementById('totalPackets').textContent=data.total_packets.toLocaleString();document.getElementById('attacksDetected').textContent=data.attacks_detected;document.getElementById('attackRate').textContent=data.attack_rate+'/min avg';document.getElementById('threatLevel').textContent=data.threat_level;trafficChart.data.labels=data.traffic_labels;trafficChart.data.datasets[0].data=data.traffic_normal;trafficChart.data.datasets[1].data=data.traffic_attacks;trafficChart.update();distChart.data.labels=data.attack_labels;distChart.data.datasets[0].data=data.attack_counts;distChart.update();if(data.heatmap){{const colors=['#ff0055','#ff0080','#ff00aa','#ff00d4','#bf00ff','#9500cc','#6b00ff','#4400ff','#0040ff','#0080ff','#00aaff','#00d4ff','#00f3ff','#00ffd4','#00ffaa','#00ff80','#00ff40','#40ff00','#80ff00','#aaff00','#d4ff00','#ffff00','#ffd400','#ffaa00'];heatmapChart.data.datasets=[];for(let h=0;h<24;h++){{heatmapChart.data.datasets.push({{label:(h<10?'0':'')+h+':00',data:data.heatmap.map(day=>day[h]),backgroundColor:colors[h],borderWidth:0}})}}heatmapChart.update()}}const alertsDiv=document.getElementById('recentAlerts');if(data.recent_alerts.length===0){{alertsDiv.innerHTML='<p class="text-center text-secondary py-4">No threats detected</p>'}}else{{alertsDiv.innerHTML=data.recent_alerts.slice(0,5).map(a=>{{let cveHtml='';if(a.cves&&a.cves.length>0){{cveHtml='<div class="cve-inline">';a.cves.forEach(cve=>{{cveHtml+=`<div><span class="cve-badge">${{cve.cve}}</span><span class="badge bg-danger">${{cve.severity}}/10</span></div><div class="cve-text">${{cve.description}}</div>`}});cveHtml+='</div>'}}return`<div class="alert-item ${{a.severity}}"><div class="d-flex justify-content-between align-items-start"><div><span class="badge-attack badge-${{a.label.toLowerCase().replace(/[-\s]/g,'-')}}">${{a.label}}</span><span class="ms-2 text-secondary">${{a.time}}</span></div><span class="badge bg-secondary">${{a.confidence}}%</span></div><div class="mt-2 text-secondary small"><i class="fas fa-bullseye"></i> Port ${{a.port}} | <i class="fas fa-cube"></i> ${{a.packets}} pkts</div>${{cveHtml}}</div>`}}).join('')}}}}catch(e){{console.error(e)}}}}
+let tickEtag=null;
+function renderDashboard(data){{document.getElementById('totalPackets').textContent=data.total_packets.toLocaleString();document.getElementById('attacksDetected').textContent=data.attacks_detected;document.getElementById('attackRate').textContent=data.attack_rate+'/min (5m)';document.getElementById('threatLevel').textContent=data.threat_level;fillInPlace(trafficChart.data.labels,data.traffic_labels);fillInPlace(trafficChart.data.datasets[0].data,data.traffic_normal);fillInPlace(trafficChart.data.datasets[1].data,data.traffic_attacks);trafficChart.update('none');fillInPlace(distChart.data.labels,data.attack_labels);fillInPlace(distChart.data.datasets[0].data,data.attack_counts);distChart.update('none');if(data.heatmap){{const ds=heatmapChart.data.datasets;for(let h=0;h<24;h++){{const d=ds[h].data;for(let day=0;day<7;day++)d[day]=data.heatmap[day][h]}}heatmapChart.update('none')}}const alertsDiv=document.getElementById('recentAlerts');if(data.recent_alerts.length===0){{alertsDiv.innerHTML='<p class="text-center text-secondary py-4">No threats detected</p>'}}else{{alertsDiv.innerHTML=data.recent_alerts.slice(0,5).map(a=>{{const cveHtml=a.cves&&a.cves.length>0?'<div class="cve-inline">'+a.cves.map(cve=>`<div><span class="cve-badge">${{cve.cve}}</span><span class="badge bg-danger">${{cve.severity}}/10</span></div><div class="cve-text">${{cve.description}}</div>`).join('')+'</div>':'';return`<div class="alert-item ${{a.severity}}"><div class="d-flex justify-content-between align-items-start"><div><span class="badge-attack badge-${{a.label.toLowerCase().replace(/[-\s]/g,'-')}}">${{a.label}}</span><span class="ms-2 text-secondary">${{a.time}}</span></div><span class="badge bg-secondary">${{a.confidence}}%</span></div><div class="mt-2 text-secondary small"><i class="fas fa-bullseye"></i> Port ${{a.port}} | <i class="fas fa-cube"></i> ${{a.packets}} pkts</div>${{cveHtml}}</div>`}}).join('')}}}}
+async function updateDashboard(){{try{{const res=await fetch('/api/tick',{{headers:tickEtag?{{'If-None-Match':tickEtag}}:{{}}}});if(res.status===304)return;tickEtag=res.headers.get('ETag');const tick=await res.json();renderDashboard(tick.dashboard)}}catch(e){{console.error(e)}}}}
 
-async function generateReport(){{const btn=document.getElementById('pdfBtn');btn.disabled=true;btn.innerHTML='<i class="fas fa-spinner fa-spin"></i> GENERATING...';try{{const res=await fetch('/api/generate_report',{{method:'POST'}});const data=await res.json();if(data.filename){{const a=document.createElement('a');a.href='/reports/'+data.filename;a.download=data.filename;a.click();btn.innerHTML='<i class="fas fa-check"></i> DOWNLOADED!';setTimeout(()=>{{btn.innerHTML='<i class="fas fa-file-export"></i> EXPORT REPORT';btn.disabled=false}},3000)}}}}catch(e){{console.error(e);btn.innerHTML='<i class="fas fa-times"></i> ERROR';setTimeout(()=>{{btn.innerHTML='<i class="fas fa-file-export"></i> EXPORT REPORT';btn.disabled=false}},3000)}}}}
+async function generateReport(){{const btn=document.getElementById('pdfBtn');btn.disabled=true;btn.innerHTML='<i class="fas fa-spinner fa-spin"></i> GENERATING...';try{{const res=await fetch('/api/generate_report',{{method:'POST'}});if(!res.ok)throw new Error(res.status);const m=/filename="?([^";]+)/.exec(res.headers.get('Content-Disposition')||'');const url=URL.createObjectURL(await res.blob());const a=document.createElement('a');a.href=url;a.download=m?m[1]:'AI_IDS_Report.pdf';a.click();setTimeout(()=>URL.revokeObjectURL(url),1000);btn.innerHTML='<i class="fas fa-check"></i> DOWNLOADED!';setTimeout(()=>{{btn.innerHTML='<i class="fas fa-file-export"></i> EXPORT REPORT';btn.disabled=false}},3000)}}catch(e){{console.error(e);btn.innerHTML='<i class="fas fa-times"></i> ERROR';setTimeout(()=>{{btn.innerHTML='<i class="fas fa-file-export"></i> EXPORT REPORT';btn.disabled=false}},3000)}}}}
 
-setInterval(updateDashboard,3000);updateDashboard();
+if(window.EventSource){{new EventSource('/api/stream').onmessage=e=>{{try{{renderDashboard(JSON.parse(e.data))}}catch(err){{console.error(err)}}}}}}else{{setInterval(updateDashboard,3000);updateDashboard()}}
 </script>
 </body>
 </html>'''
@@ -613,7 +803,7 @@ SETTINGS_HTML = f'''<!DOCTYPE html>
 </div></div>
 <div class="col-lg-6"><div class="chart-card"><h5 class="card-title mb-3"><i class="fas fa-info-circle"></i> System Configuration</h5>
 <table class="table table-dark table-sm">
-<tr><td><strong>Model Type</strong></td><td class="text-end">Random Forest</td></tr>
+<tr><td><strong>Model Type</strong></td><td class="text-end">Gradient Boosting</td></tr>
 <tr><td><strong>Model Version</strong></td><td class="text-end">1.0</td></tr>
 <tr><td><strong>Dataset</strong></td><td class="text-end">CIC-IDS2017</td></tr>
 <tr><td><strong>Training Samples</strong></td><td class="text-end">376,437</td></tr>
@@ -633,60 +823,82 @@ setInterval(updateSystemStats,2000);updateSystemStats();
 </body>
 </html>'''
 
+# The page blobs are constant for the life of the process, so encode and hash
+# them once and let repeat navigations revalidate with a bodiless 304.
+def build_page(html):
+    """Encode a page once at startup: (raw bytes, gzip bytes, etag)"""
+    body = html.encode()
+    return body, gzip.compress(body, compresslevel=9), hashlib.md5(body).hexdigest()
+
+OVERVIEW_PAGE = build_page(OVERVIEW_HTML)
+ALERTS_PAGE = build_page(ALERTS_HTML)
+ANALYTICS_PAGE = build_page(ANALYTICS_HTML)
+SETTINGS_PAGE = build_page(SETTINGS_HTML)
+
+def serve_page(page):
+    """Return a pre-encoded (and pre-gzipped) page, or 304 if the client already holds it"""
+    body, gz, etag = page
+    use_gzip = request.accept_encodings['gzip'] > 0
+    if use_gzip:
+        etag += '-gz'
+    headers = {'Cache-Control': 'public, max-age=60', 'Vary': 'Accept-Encoding'}
+    if request.if_none_match.contains(etag):
+        return Response(status=304, headers={'ETag': f'"{etag}"', **headers})
+    resp = Response(gz if use_gzip else body, mimetype='text/html', headers=headers)
+    if use_gzip:
+        # Already compressed, so Flask-Compress leaves it alone
+        resp.headers['Content-Encoding'] = 'gzip'
+    resp.set_etag(etag)
+    return resp
+
 # Routes
 @app.route('/')
 def index():
-    return OVERVIEW_HTML
+    return serve_page(OVERVIEW_PAGE)
 
 @app.route('/alerts')
 def alerts_page():
-    return ALERTS_HTML
+    return serve_page(ALERTS_PAGE)
 
 @app.route('/analytics')
 def analytics_page():
-    return ANALYTICS_HTML
+    return serve_page(ANALYTICS_PAGE)
 
 @app.route('/settings')
 def settings_page():
-    return SETTINGS_HTML
+    return serve_page(SETTINGS_PAGE)
 
-@app.route('/api/dashboard')
-def api_dashboard():
-    data = read_shared()
+def build_dashboard(data, stats):
+    """Assemble the command-center payload (KPIs, charts, recent alerts)"""
     alerts = data.get("alerts", [])
     traffic = data.get("traffic", [])
-    total_packets = sum(t['fwd_pkts'] + t['bwd_pkts'] for t in traffic)
+    total_packets = stats['total_packets']
     attacks = len(alerts)
     
-    if alerts:
-        first = datetime.fromisoformat(alerts[0]['timestamp'])
-        last = datetime.fromisoformat(alerts[-1]['timestamp'])
-        minutes = max((last - first).seconds / 60, 1)
-        rate = round(attacks / minutes, 1)
-    else:
-        rate = 0
-    
-    level, color = get_threat_level()
     now = datetime.now()
-    labels = [(now - timedelta(minutes=i)).strftime('%H:%M') for i in range(59, -1, -1)]
+    recent_count = count_recent_alerts(alerts, now)
+    rate = round(recent_count / (RATE_WINDOW_SECONDS / 60), 1)
+    attack_type_counts, heatmap = stats['type_counts'], stats['heatmap']
+    level, color = get_threat_level(recent_count)
+    minutes = [now - timedelta(minutes=i) for i in range(59, -1, -1)]
+    labels = [m.strftime('%H:%M') for m in minutes]
     attack_counts = [0] * 60
     normal_counts = [0] * 60
     
+    # Bucket on the timestamp's 'YYYY-MM-DDTHH:MM' prefix: one dict lookup per
+    # row, no datetime parsing, and rows land under their own minute's label
+    slots = {m.isoformat(timespec='minutes'): i for i, m in enumerate(minutes)}
     for t in traffic[-200:]:
-        ts = datetime.fromisoformat(t['timestamp'])
-        mins_ago = int((now - ts).seconds / 60)
-        if mins_ago < 60:
+        i = slots.get(t['timestamp'][:16])
+        if i is not None:
             if t['is_attack']:
-                attack_counts[59 - mins_ago] += 1
+                attack_counts[i] += 1
             else:
-                normal_counts[59 - mins_ago] += 1
+                normal_counts[i] += 1
     
-    attack_type_counts = Counter(a['label'] for a in alerts)
     attack_labels = ['DDoS', 'PortScan', 'Bot', 'SQL-Injection', 'XSS-Attack', 'SSH-Brute-Force', 'Slowloris-DoS']
     attack_data = [attack_type_counts.get(label, 0) for label in attack_labels]
     
-    heatmap = generate_heatmap_data()
-    
     recent = []
     for a in alerts[-10:]:
         conf = a['confidence']
@@ -703,7 +915,7 @@ def api_dashboard():
         
         recent.append({
             'label': a['label'],
-            'time': datetime.fromisoformat(a['timestamp']).strftime('%H:%M:%S'),
+            'time': a.get('hms') or a['timestamp'][11:19],
             'confidence': conf,
             'port': a.get('dst_port', '—'),
             'packets': a['fwd_pkts'] + a['bwd_pkts'],
@@ -711,7 +923,7 @@ def api_dashboard():
             'cves': cves
         })
     
-    return jsonify({
+    return {
         'total_packets': total_packets,
         'attacks_detected': attacks,
         'attack_rate': rate,
@@ -723,12 +935,13 @@ def api_dashboard():
         'attack_counts': attack_data,
         'heatmap': heatmap,
         'recent_alerts': recent
-    })
+    }
 
-@app.route('/api/all_alerts')
-def api_all_alerts():
-    data = read_shared()
+def build_all_alerts(data, limit=None):
+    """Assemble the threat-database rows for the stored alerts (newest `limit` if given)"""
     alerts = data.get("alerts", [])
+    if limit is not None and limit > 0:
+        alerts = alerts[-limit:]
     result = []
     for a in alerts:
         conf = a['confidence']
@@ -742,7 +955,7 @@ def api_all_alerts():
             severity = 'MEDIUM'
             color = 'info'
         result.append({
-            'time': datetime.fromisoformat(a['timestamp']).strftime('%Y-%m-%d %H:%M:%S'),
+            'time': a['timestamp'][:10] + ' ' + a['timestamp'][11:19],
             'label': a['label'],
             'confidence': a['confidence'],
             'severity': severity,
@@ -750,19 +963,10 @@ def api_all_alerts():
             'port': a.get('dst_port', '—'),
             'packets': a['fwd_pkts'] + a['bwd_pkts']
         })
-    return jsonify(result)
-
-@app.route('/api/export_alerts_csv')
-def api_export_csv():
-    data = read_shared()
-    alerts = data.get("alerts", [])
-    csv = "Timestamp,Attack Type,Confidence,Port,Packets\n"
-    for a in alerts:
-        csv += f"{a['timestamp']},{a['label']},{a['confidence']},{a.get('dst_port','')},{a['fwd_pkts']+a['bwd_pkts']}\n"
-    return Response(csv, mimetype='text/csv', headers={'Content-Disposition': 'attachment;filename=threats.csv'})
+    return result
 
-@app.route('/api/system_stats')
-def api_system_stats():
+def build_system_stats():
+    """Sample host resource usage and dashboard uptime"""
     cpu = psutil.cpu_percent(interval=0.1)
     mem = psutil.virtual_memory().percent
     disk = psutil.disk_usage('/').percent
@@ -773,21 +977,132 @@ def api_system_stats():
         uptime_str = f"{uptime_seconds // 60}m"
     else:
         uptime_str = f"{uptime_seconds // 3600}h {(uptime_seconds % 3600) // 60}m"
-    return jsonify({'cpu': round(cpu, 1),'memory': round(mem, 1),'disk': round(disk, 1),'uptime': uptime_str})
+    return {'cpu': round(cpu, 1),'memory': round(mem, 1),'disk': round(disk, 1),'uptime': uptime_str}
+
+@app.route('/api/dashboard')
+def api_dashboard():
+    return Response(dashboard_body(), mimetype='application/json')
+
+@app.route('/api/all_alerts')
+def api_all_alerts():
+    limit = request.args.get('limit', type=int)
+    if limit is not None and limit > 0:
+        return jsonify(build_all_alerts(read_shared(), limit))
+    return Response(all_alerts_body(), mimetype='application/json')
+
+def held_etag(etag):
+    """The If-None-Match tag matching etag, or None. Flask-Compress rewrites
+    the ETag of a compressed response to "<etag>:gzip" (":br", ...), which is
+    what clients send back, so the suffix is ignored when comparing."""
+    if request.if_none_match.star_tag:
+        return etag
+    for tag in request.if_none_match.as_set(include_weak=True):
+        if tag.split(':', 1)[0] == etag:
+            return tag
+    return None
+
+TICK_STAT_STEP = 5  # percent; smaller system-stat moves don't invalidate a tick
+
+@app.route('/api/tick')
+def api_tick():
+    """Combined dashboard + alerts + system payload for a single poll.
+
+    The ETag is derived from the shared file's mtime, the current minute
+    (chart labels and threat level are time-relative) and the system stats
+    in TICK_STAT_STEP buckets, so an unchanged tick is answered with an
+    empty 304. CPU/memory jitter by a fraction of a percent on every sample;
+    keyed exactly they would change the ETag on every poll.
+    """
+    system = build_system_stats()
+    try:
+        mtime = os.stat(SHARED_FILE).st_mtime_ns
+    except OSError:
+        mtime = 0
+    buckets = ':'.join(str(int(system[k] // TICK_STAT_STEP)) for k in ('cpu', 'memory', 'disk'))
+    key = f"{mtime}:{datetime.now():%Y%m%d%H%M}:{buckets}"
+    etag = hashlib.md5(key.encode()).hexdigest()
+    held = held_etag(etag)
+    if held:
+        return Response(status=304, headers={'ETag': f'"{held}"'})
+    # Splice the cached dashboard/alerts bodies; only the small system dict is serialized here
+    body = b''.join([b'{"dashboard":', dashboard_body(), b',"alerts":', all_alerts_body(),
+                     b',"system":', dumps_bytes(system), b'}'])
+    resp = Response(body, mimetype='application/json')
+    resp.set_etag(etag)
+    return resp
+
+STREAM_POLL_SECONDS = 0.5
+STREAM_KEEPALIVE_SECONDS = 15
+
+def dashboard_event():
+    """SSE frame around the cached dashboard body, shared by every open stream"""
+    return b'data: ' + dashboard_body() + b'\n\n'
+
+@app.route('/api/stream')
+def api_stream():
+    """Server-Sent Events feed for the overview page.
+
+    Each stream only stats the shared file; a new dashboard is pushed when
+    the file changes or the minute rolls over, so server work follows
+    capture updates rather than the number of open tabs.
+    """
+    def event_stream():
+        last = None
+        idle = 0.0
+        while True:
+            try:
+                st = os.stat(SHARED_FILE)
+                file_key = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                file_key = None
+            key = (file_key, f"{datetime.now():%Y%m%d%H%M}")
+            if key != last:
+                last = key
+                idle = 0.0
+                yield dashboard_event()
+            elif idle >= STREAM_KEEPALIVE_SECONDS:
+                idle = 0.0
+                yield b': keepalive\n\n'
+            time.sleep(STREAM_POLL_SECONDS)
+            idle += STREAM_POLL_SECONDS
+    return Response(event_stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/export_alerts_csv')
+def api_export_csv():
+    data = read_shared()
+    alerts = data.get("alerts", [])
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator='\n')
+    writer.writerow(['Timestamp', 'Attack Type', 'Confidence', 'Port', 'Packets'])
+    writer.writerows(
+        [a['timestamp'], a['label'], a['confidence'], a.get('dst_port', ''), a['fwd_pkts'] + a['bwd_pkts']]
+        for a in alerts
+    )
+    return Response(buf.getvalue(), mimetype='text/csv', headers={'Content-Disposition': 'attachment;filename=threats.csv'})
+
+@app.route('/api/system_stats')
+def api_system_stats():
+    return jsonify(build_system_stats())
 
 @app.route('/api/generate_report', methods=['POST'])
 def api_generate_report():
-    sys.path.insert(0, str(Path(__file__).parent))
     from report_generator import IDSReportGenerator
     data = read_shared()
     alerts = data.get("alerts", [])
     generator = IDSReportGenerator(alerts)
-    filename = generator.generate_report()
-    return jsonify({"filename": filename})
+    # Build the PDF in memory and send it back in this response, instead of
+    # writing it to reports/ and having the client fetch it a second time
+    buf = io.BytesIO()
+    filename = generator.generate_report(buf)
+    buf.seek(0)
+    return send_file(buf, mimetype='application/pdf', as_attachment=True, download_name=filename)
 
 @app.route('/reports/<path:filename>')
 def serve_report(filename):
-    return send_from_directory(str(REPORTS_DIR), filename)
+    # Reports never change once written: let clients revalidate via ETag /
+    # If-Modified-Since, and let the WSGI server stream the file (sendfile)
+    return send_from_directory(str(REPORTS_DIR), filename, conditional=True, etag=True, max_age=3600)
 
 if __name__ == '__main__':
     print("\n" + "="*60)
@@ -795,4 +1110,5 @@ if __name__ == '__main__':
     print("  🌐 http://127.0.0.1:5000")
     print("  🎯 7 Attack Types + Inline CVE Intelligence")
     print("="*60 + "\n")
-    app.run(host='0.0.0.0', port=5000, debug=False)
+    # Dev server only; see README for running under gunicorn
+    app.run(host='0.0.0.0', port=5000, debug=False, threaded=True)
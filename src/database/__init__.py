@@ -1,8 +1,9 @@
-from .models import init_database, get_session, Alert, TrafficLog, SystemEvent, AttackStatistics
-from .queries import IDSDatabase, save_alert, get_dashboard_stats
+from .models import init_database, get_session, remove_session, Alert, AlertHourly, TrafficLog, SystemEvent, AttackStatistics
+from .queries import IDSDatabase, AlertWriter, save_alert, save_traffic_batch, get_dashboard_stats
 
 __all__ = [
-    'init_database', 'get_session', 
-    'Alert', 'TrafficLog', 'SystemEvent', 'AttackStatistics',
-    'IDSDatabase', 'save_alert', 'get_dashboard_stats'
+    'init_database', 'get_session', 'remove_session',
+    'Alert', 'AlertHourly', 'TrafficLog', 'SystemEvent', 'AttackStatistics',
+    'IDSDatabase', 'AlertWriter', 'save_alert', 'save_traffic_batch',
+    'get_dashboard_stats'
 ]
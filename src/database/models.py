@@ -3,16 +3,18 @@
 AI-IDS Database Models
 SQLAlchemy models for storing all IDS data
 """
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Boolean, Text
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event, Column, Index, Integer, String, Float, DateTime, Boolean, Text
+from sqlalchemy.orm import DeclarativeBase, scoped_session, sessionmaker
+from sqlalchemy.exc import OperationalError
 from datetime import datetime
 from pathlib import Path
 
 BASE_DIR = Path('/home/aashish/AI-IDS-Project')
 DB_PATH = BASE_DIR / 'data' / 'ids_database.db'
 
-Base = declarative_base()
+class Base(DeclarativeBase):
+    """Declarative base for all IDS tables"""
+    pass
 
 class Alert(Base):
     """Detected attacks/threats"""
@@ -47,6 +49,16 @@ class Alert(Base):
     
     created_at = Column(DateTime, default=datetime.now)
     
+    # "latest alerts of type X" / "critical alerts since T" filter on one
+    # column and range/sort on timestamp; SQLite uses one index per table.
+    # The IP indexes serve subnet searches as string ranges.
+    __table_args__ = (
+        Index('ix_alerts_type_ts', 'attack_type', 'timestamp'),
+        Index('ix_alerts_level_ts', 'threat_level', 'timestamp'),
+        Index('ix_alerts_src_ip', 'source_ip'),
+        Index('ix_alerts_dst_ip', 'dest_ip'),
+    )
+    
     def __repr__(self):
         return f"<Alert {self.id}: {self.attack_type} @ {self.timestamp}>"
 
@@ -96,6 +108,19 @@ class SystemEvent(Base):
         return f"<SystemEvent {self.id}: {self.event_type} @ {self.timestamp}>"
 
 
+class AlertHourly(Base):
+    """Alert counts per hour, attack type and threat level (kept by a trigger)"""
+    __tablename__ = 'alert_hourly'
+    
+    hour = Column(DateTime, primary_key=True)
+    attack_type = Column(String(50), primary_key=True)
+    threat_level = Column(String(20), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<AlertHourly {self.hour} {self.attack_type}/{self.threat_level}: {self.count}>"
+
+
 class AttackStatistics(Base):
     """Aggregated attack statistics (hourly/daily)"""
     __tablename__ = 'attack_statistics'
@@ -130,17 +155,113 @@ class AttackStatistics(Base):
 
 
 # Database engine and session
-engine = create_engine(f'sqlite:///{DB_PATH}', echo=False)
-Session = sessionmaker(bind=engine)
+engine = create_engine(f'sqlite:///{DB_PATH}', echo=False,
+                       connect_args={'check_same_thread': False})
+
+@event.listens_for(engine, 'connect')
+def _set_sqlite_pragmas(dbapi_conn, _):
+    """WAL lets the dashboard read while capture writes; NORMAL sync skips the fsync per commit"""
+    cur = dbapi_conn.cursor()
+    cur.execute('PRAGMA journal_mode=WAL')
+    cur.execute('PRAGMA synchronous=NORMAL')
+    cur.execute('PRAGMA temp_store=MEMORY')
+    cur.execute('PRAGMA mmap_size=268435456')  # 256 MB
+    cur.execute('PRAGMA cache_size=-65536')    # 64 MB
+    cur.close()
+
+# One session per thread, reused across calls so the pooled connection stays open;
+# objects stay readable after commit instead of being reloaded on next access
+Session = scoped_session(sessionmaker(bind=engine, expire_on_commit=False))
+
+# Trigram full-text index over the searchable alert columns, kept in sync by
+# triggers, so substring search doesn't scan the whole table (SQLite 3.34+)
+ALERTS_FTS_DDL = (
+    "CREATE VIRTUAL TABLE alerts_fts USING fts5("
+    "attack_type, source_ip, dest_ip, content='alerts', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER alerts_fts_ai AFTER INSERT ON alerts BEGIN "
+    "INSERT INTO alerts_fts(rowid, attack_type, source_ip, dest_ip) "
+    "VALUES (new.id, new.attack_type, new.source_ip, new.dest_ip); END",
+    "CREATE TRIGGER alerts_fts_ad AFTER DELETE ON alerts BEGIN "
+    "INSERT INTO alerts_fts(alerts_fts, rowid, attack_type, source_ip, dest_ip) "
+    "VALUES ('delete', old.id, old.attack_type, old.source_ip, old.dest_ip); END",
+    "CREATE TRIGGER alerts_fts_au AFTER UPDATE ON alerts BEGIN "
+    "INSERT INTO alerts_fts(alerts_fts, rowid, attack_type, source_ip, dest_ip) "
+    "VALUES ('delete', old.id, old.attack_type, old.source_ip, old.dest_ip); "
+    "INSERT INTO alerts_fts(rowid, attack_type, source_ip, dest_ip) "
+    "VALUES (new.id, new.attack_type, new.source_ip, new.dest_ip); END",
+    "INSERT INTO alerts_fts(alerts_fts) VALUES ('rebuild')",  # index existing rows
+)
+
+# Hourly rollup of alerts so windowed stats sum a few buckets instead of
+# scanning every alert. Timestamps are stored as 'YYYY-MM-DD HH:MM:SS.ffffff',
+# so the first 13 characters are the hour.
+ALERT_HOURLY_BUCKET = "substr({}.timestamp, 1, 13) || ':00:00.000000'"
+ALERT_HOURLY_DDL = (
+    "CREATE TRIGGER alert_hourly_ai AFTER INSERT ON alerts BEGIN "
+    "INSERT INTO alert_hourly(hour, attack_type, threat_level, count) "
+    f"VALUES ({ALERT_HOURLY_BUCKET.format('new')}, new.attack_type, new.threat_level, 1) "
+    "ON CONFLICT(hour, attack_type, threat_level) DO UPDATE SET count = count + 1; END",
+    "CREATE TRIGGER alert_hourly_ad AFTER DELETE ON alerts BEGIN "
+    "UPDATE alert_hourly SET count = count - 1 "
+    f"WHERE hour = {ALERT_HOURLY_BUCKET.format('old')} "
+    "AND attack_type = old.attack_type AND threat_level = old.threat_level; END",
+    # An edited alert moves from its old bucket to its new one
+    "CREATE TRIGGER alert_hourly_au AFTER UPDATE OF timestamp, attack_type, threat_level ON alerts BEGIN "
+    "UPDATE alert_hourly SET count = count - 1 "
+    f"WHERE hour = {ALERT_HOURLY_BUCKET.format('old')} "
+    "AND attack_type = old.attack_type AND threat_level = old.threat_level; "
+    "INSERT INTO alert_hourly(hour, attack_type, threat_level, count) "
+    f"VALUES ({ALERT_HOURLY_BUCKET.format('new')}, new.attack_type, new.threat_level, 1) "
+    "ON CONFLICT(hour, attack_type, threat_level) DO UPDATE SET count = count + 1; END",
+    "DELETE FROM alert_hourly",  # backfill from alerts already stored
+    "INSERT INTO alert_hourly(hour, attack_type, threat_level, count) "
+    f"SELECT {ALERT_HOURLY_BUCKET.format('alerts')}, attack_type, threat_level, count(*) "
+    "FROM alerts GROUP BY 1, 2, 3",
+)
+
+def init_alert_hourly():
+    """Install the alert_hourly triggers and backfill it on first run"""
+    with engine.begin() as conn:
+        if conn.exec_driver_sql("SELECT 1 FROM sqlite_master WHERE name = 'alert_hourly_au'").first():
+            return
+        # Rollups built before the update trigger existed may have drifted:
+        # reinstall every trigger and recount from alerts
+        conn.exec_driver_sql("DROP TRIGGER IF EXISTS alert_hourly_ai")
+        conn.exec_driver_sql("DROP TRIGGER IF EXISTS alert_hourly_ad")
+        for ddl in ALERT_HOURLY_DDL:
+            conn.exec_driver_sql(ddl)
+
+def init_alerts_fts():
+    """Create the alerts search index if this SQLite build supports it"""
+    try:
+        with engine.begin() as conn:
+            if conn.exec_driver_sql("SELECT 1 FROM sqlite_master WHERE name = 'alerts_fts'").first():
+                return True
+            for ddl in ALERTS_FTS_DDL:
+                conn.exec_driver_sql(ddl)
+        return True
+    except OperationalError as e:
+        print(f"⚠️  Alert search index unavailable, using LIKE scans: {e}")
+        return False
 
 def init_database():
     """Initialize database and create all tables"""
     Base.metadata.create_all(engine)
+    # create_all skips tables that already exist, so add newer indexes explicitly
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+    init_alert_hourly()
+    init_alerts_fts()
     print(f"✅ Database initialized: {DB_PATH}")
 
 def get_session():
-    """Get a new database session"""
+    """Get this thread's database session"""
     return Session()
 
+def remove_session():
+    """Close this thread's session and return its connection to the pool"""
+    Session.remove()
+
 if __name__ == "__main__":
     init_database()
@@ -3,9 +3,35 @@
 AI-IDS Database Queries
 Common database operations and queries
 """
-from sqlalchemy import func, desc, and_, or_
+from sqlalchemy import func, desc, and_, or_, insert, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import raiseload
 from datetime import datetime, timedelta
-from .models import get_session, Alert, TrafficLog, SystemEvent, AttackStatistics
+import ipaddress, queue, threading, time
+from bisect import bisect_right
+from .models import get_session, remove_session, Alert, AlertHourly, TrafficLog, SystemEvent, AttackStatistics
+
+# Confidence cut-offs: below 75 LOW, 75+ MEDIUM, 85+ HIGH, 95+ CRITICAL
+THREAT_THRESHOLDS = (75, 85, 95)
+THREAT_LEVELS = ('LOW', 'MEDIUM', 'HIGH', 'CRITICAL')
+
+# Dashboards poll several times a second; serve stats from memory between
+# refreshes. Alerts are written by the capture process, so the cache is keyed
+# on the newest alert id in the shared DB rather than invalidated in-process
+DASHBOARD_STATS_TTL = 5.0
+_STATS_CACHE = {'at': 0.0, 'value': None, 'latest_id': None}
+_STATS_LOCK = threading.Lock()
+
+def _ipv4_ranges(cidr):
+    """String ranges [lo, hi) that hold exactly the dotted IPv4 addresses in `cidr`"""
+    net = ipaddress.IPv4Network(cidr, strict=False)
+    octets = max(1, -(-net.prefixlen // 8))  # round the prefix up to whole octets
+    if octets == 4:
+        return [(str(ip), str(ip) + '\0') for ip in net]  # /25-/32: each address
+    # '10.1.' <= ip < '10.1/' since '/' is the character after '.'
+    prefixes = ['.'.join(str(sub.network_address).split('.')[:octets]) + '.'
+                for sub in net.subnets(new_prefix=octets * 8)]
+    return [(p, p[:-1] + '/') for p in prefixes]
 
 class IDSDatabase:
     """Main database interface for IDS operations"""
@@ -13,104 +39,156 @@ class IDSDatabase:
     def __init__(self):
         self.session = get_session()
     
+    @staticmethod
+    def _alert_row(attack_data):
+        """Column values for one Alert row"""
+        conf = attack_data['confidence']
+        return {
+            'timestamp': datetime.fromisoformat(attack_data['timestamp']),
+            'attack_type': attack_data['label'],
+            'confidence': conf,
+            'threat_level': THREAT_LEVELS[bisect_right(THREAT_THRESHOLDS, conf)],
+            'source_ip': attack_data.get('src_ip', '0.0.0.0'),
+            'dest_ip': attack_data.get('dst_ip', '0.0.0.0'),
+            'source_port': attack_data.get('src_port', 0),
+            'dest_port': attack_data.get('dst_port', 0),
+            'protocol': attack_data.get('protocol', 'TCP'),
+            'fwd_packets': attack_data.get('fwd_pkts', 0),
+            'bwd_packets': attack_data.get('bwd_pkts', 0),
+            'total_bytes': attack_data.get('total_bytes', 0),
+            'detection_method': attack_data.get('detection_method', 'HYBRID'),
+            'model_version': '1.0'
+        }
+    
     def add_alert(self, attack_data):
         """Add a new alert to database"""
         try:
-            # Determine threat level
-            conf = attack_data['confidence']
-            if conf >= 95:
-                threat_level = 'CRITICAL'
-            elif conf >= 85:
-                threat_level = 'HIGH'
-            elif conf >= 75:
-                threat_level = 'MEDIUM'
-            else:
-                threat_level = 'LOW'
-            
-            alert = Alert(
-                timestamp=datetime.fromisoformat(attack_data['timestamp']),
-                attack_type=attack_data['label'],
-                confidence=attack_data['confidence'],
-                threat_level=threat_level,
-                source_ip=attack_data.get('src_ip', '0.0.0.0'),
-                dest_ip=attack_data.get('dst_ip', '0.0.0.0'),
-                source_port=attack_data.get('src_port', 0),
-                dest_port=attack_data.get('dst_port', 0),
-                protocol=attack_data.get('protocol', 'TCP'),
-                fwd_packets=attack_data.get('fwd_pkts', 0),
-                bwd_packets=attack_data.get('bwd_pkts', 0),
-                total_bytes=attack_data.get('total_bytes', 0),
-                detection_method=attack_data.get('detection_method', 'HYBRID'),
-                model_version='1.0'
-            )
-            
-            self.session.add(alert)
+            # Core INSERT ... RETURNING: no unit-of-work flush or identity map
+            row = self._alert_row(attack_data)
+            alert_id = self.session.execute(insert(Alert).values(**row).returning(Alert.id)).scalar()
             self.session.commit()
-            return alert.id
+            return alert_id
         except Exception as e:
             self.session.rollback()
             print(f"❌ Database error: {e}")
             return None
     
+    def add_alert_batch(self, alerts):
+        """Add many alerts as one executemany INSERT in a single commit.
+
+        Returns how many were stored: malformed alerts are skipped, and if the
+        batch insert fails it is retried row by row, so one bad alert costs
+        only itself.
+        """
+        rows = []
+        for attack_data in alerts:
+            try:
+                rows.append(self._alert_row(attack_data))
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"❌ Skipping malformed alert: {e!r}")
+        if not rows:
+            return 0
+        try:
+            self.session.execute(insert(Alert), rows)
+            self.session.commit()
+            return len(rows)
+        except Exception as e:
+            self.session.rollback()
+            print(f"❌ Database error, retrying batch row by row: {e}")
+        
+        written = 0
+        for row in rows:
+            try:
+                self.session.execute(insert(Alert).values(**row))
+                self.session.commit()
+                written += 1
+            except Exception as e:
+                self.session.rollback()
+                print(f"❌ Database error: {e}")
+        return written
+    
+    def _alerts(self):
+        """Alert query for read paths; lazy loads raise instead of issuing N+1 SELECTs"""
+        return self.session.query(Alert).options(raiseload('*'))
+    
     def get_recent_alerts(self, limit=100):
         """Get most recent alerts"""
-        return self.session.query(Alert).order_by(desc(Alert.timestamp)).limit(limit).all()
+        return self._alerts().order_by(desc(Alert.timestamp)).limit(limit).all()
     
     def get_alerts_by_type(self, attack_type, limit=50):
         """Get alerts of specific type"""
-        return self.session.query(Alert).filter(Alert.attack_type == attack_type).order_by(desc(Alert.timestamp)).limit(limit).all()
+        return self._alerts().filter(Alert.attack_type == attack_type).order_by(desc(Alert.timestamp)).limit(limit).all()
     
     def get_alerts_in_timerange(self, start_time, end_time):
         """Get alerts within time range"""
-        return self.session.query(Alert).filter(
+        return self._alerts().filter(
             and_(Alert.timestamp >= start_time, Alert.timestamp <= end_time)
         ).order_by(desc(Alert.timestamp)).all()
     
-    def get_critical_alerts(self, hours=24):
+    def get_critical_alerts(self, hours=24, now=None):
         """Get critical alerts from last N hours"""
-        cutoff = datetime.now() - timedelta(hours=hours)
-        return self.session.query(Alert).filter(
+        cutoff = (now or datetime.now()) - timedelta(hours=hours)
+        return self._alerts().filter(
             and_(Alert.threat_level == 'CRITICAL', Alert.timestamp >= cutoff)
         ).order_by(desc(Alert.timestamp)).all()
     
-    def get_attack_statistics(self, hours=24):
+    def get_attack_statistics(self, hours=24, now=None):
         """Get attack statistics for last N hours"""
-        cutoff = datetime.now() - timedelta(hours=hours)
+        cutoff = (now or datetime.now()) - timedelta(hours=hours)
+        boundary = cutoff.replace(minute=0, second=0, microsecond=0)
+        if boundary < cutoff:
+            boundary += timedelta(hours=1)
         
-        total = self.session.query(func.count(Alert.id)).filter(Alert.timestamp >= cutoff).scalar()
+        # Whole hours come from the alert_hourly rollup; only the partial hour
+        # before the first whole bucket is counted from alerts. Both are grouped
+        # by (type, level) and summed here since SQLite has no GROUPING SETS.
+        rows = self.session.query(
+            AlertHourly.attack_type,
+            AlertHourly.threat_level,
+            func.sum(AlertHourly.count)
+        ).filter(AlertHourly.hour >= boundary).group_by(AlertHourly.attack_type, AlertHourly.threat_level).all()
         
-        by_type = self.session.query(
+        rows += self.session.query(
             Alert.attack_type,
-            func.count(Alert.id).label('count')
-        ).filter(Alert.timestamp >= cutoff).group_by(Alert.attack_type).all()
-        
-        by_severity = self.session.query(
             Alert.threat_level,
-            func.count(Alert.id).label('count')
-        ).filter(Alert.timestamp >= cutoff).group_by(Alert.threat_level).all()
+            func.count(Alert.id)
+        ).filter(and_(Alert.timestamp >= cutoff, Alert.timestamp < boundary)).group_by(Alert.attack_type, Alert.threat_level).all()
+        
+        total = 0
+        by_type = {}
+        by_severity = {}
+        for attack_type, threat_level, count in rows:
+            total += count
+            by_type[attack_type] = by_type.get(attack_type, 0) + count
+            by_severity[threat_level] = by_severity.get(threat_level, 0) + count
         
         return {
             'total': total,
-            'by_type': dict(by_type),
-            'by_severity': dict(by_severity),
+            'by_type': by_type,
+            'by_severity': by_severity,
             'timerange': f'Last {hours} hours'
         }
     
+    @staticmethod
+    def _traffic_row(stats, now):
+        """Column values for one TrafficLog row"""
+        return {
+            'timestamp': stats.get('timestamp', now),
+            'total_packets': stats.get('total_packets', 0),
+            'benign_packets': stats.get('benign_packets', 0),
+            'malicious_packets': stats.get('malicious_packets', 0),
+            'total_bytes': stats.get('total_bytes', 0),
+            'bytes_per_second': stats.get('bytes_per_second', 0.0),
+            'tcp_count': stats.get('tcp_count', 0),
+            'udp_count': stats.get('udp_count', 0),
+            'icmp_count': stats.get('icmp_count', 0),
+            'other_count': stats.get('other_count', 0)
+        }
+    
     def log_traffic(self, stats):
         """Log traffic statistics"""
         try:
-            log = TrafficLog(
-                timestamp=datetime.now(),
-                total_packets=stats.get('total_packets', 0),
-                benign_packets=stats.get('benign_packets', 0),
-                malicious_packets=stats.get('malicious_packets', 0),
-                total_bytes=stats.get('total_bytes', 0),
-                bytes_per_second=stats.get('bytes_per_second', 0.0),
-                tcp_count=stats.get('tcp_count', 0),
-                udp_count=stats.get('udp_count', 0),
-                icmp_count=stats.get('icmp_count', 0),
-                other_count=stats.get('other_count', 0)
-            )
+            log = TrafficLog(**self._traffic_row(stats, datetime.now()))
             self.session.add(log)
             self.session.commit()
             return True
@@ -119,6 +197,20 @@ class IDSDatabase:
             print(f"❌ Traffic log error: {e}")
             return False
     
+    def log_traffic_batch(self, stats_list):
+        """Log many traffic snapshots as one executemany INSERT in a single commit"""
+        if not stats_list:
+            return 0
+        now = datetime.now()
+        try:
+            self.session.execute(insert(TrafficLog), [self._traffic_row(s, now) for s in stats_list])
+            self.session.commit()
+            return len(stats_list)
+        except Exception as e:
+            self.session.rollback()
+            print(f"❌ Traffic log error: {e}")
+            return 0
+    
     def log_system_event(self, event_type, severity, message, details=None):
         """Log system event"""
         try:
@@ -137,18 +229,47 @@ class IDSDatabase:
             print(f"❌ Event log error: {e}")
             return False
     
+    def get_latest_alert_id(self):
+        """Id of the newest alert (primary-key lookup), None if there are none"""
+        return self.session.query(func.max(Alert.id)).scalar()
+    
     def get_total_alerts(self):
         """Get total alert count"""
         return self.session.query(func.count(Alert.id)).scalar()
     
-    def get_alert_count_today(self):
+    def get_alert_count_today(self, now=None):
         """Get alert count for today"""
-        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        today = (now or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
         return self.session.query(func.count(Alert.id)).filter(Alert.timestamp >= today).scalar()
     
+    def get_alerts_in_subnet(self, cidr, limit=100):
+        """Alerts whose source or destination IPv4 address is inside `cidr`"""
+        # IPs are stored as dotted strings, so a subnet becomes a few string
+        # ranges that the IP indexes can seek to
+        conds = [and_(col >= lo, col < hi)
+                 for lo, hi in _ipv4_ranges(cidr)
+                 for col in (Alert.source_ip, Alert.dest_ip)]
+        return self._alerts().filter(or_(*conds)).order_by(desc(Alert.timestamp)).limit(limit).all()
+    
     def search_alerts(self, search_term):
         """Search alerts by attack type or IP"""
-        return self.session.query(Alert).filter(
+        if '/' in search_term:
+            try:
+                return self.get_alerts_in_subnet(search_term)
+            except ValueError:
+                pass  # not a CIDR, search it as text
+        
+        # The trigram index needs at least 3 characters to match on
+        if len(search_term) >= 3:
+            try:
+                return self._alerts().from_statement(text(
+                    "SELECT alerts.* FROM alerts JOIN alerts_fts ON alerts_fts.rowid = alerts.id "
+                    "WHERE alerts_fts MATCH :q ORDER BY alerts.timestamp DESC LIMIT 100"
+                )).params(q='"' + search_term.replace('"', '""') + '"').all()
+            except OperationalError:
+                self.session.rollback()  # no FTS5 index here, fall back to a scan
+        
+        return self._alerts().filter(
             or_(
                 Alert.attack_type.like(f'%{search_term}%'),
                 Alert.source_ip.like(f'%{search_term}%'),
@@ -158,29 +279,106 @@ class IDSDatabase:
     
     def close(self):
         """Close database session"""
-        self.session.close()
+        remove_session()
+
+class AlertWriter:
+    """Background thread that buffers alerts and writes them in batches"""
+    
+    def __init__(self, max_batch=500, interval=0.1, max_queued=10000):
+        self.max_batch = max_batch
+        self.interval = interval
+        self.written = 0
+        self.dropped = 0  # queue full, malformed, or rejected by the database
+        self._count_lock = threading.Lock()  # dropped is bumped from both threads
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='alert-writer', daemon=True)
+        self._thread.start()
+    
+    def put(self, attack_data):
+        """Queue an alert; returns False if the buffer is full"""
+        try:
+            self._queue.put_nowait(attack_data)
+            return True
+        except queue.Full:
+            with self._count_lock:
+                self.dropped += 1
+            return False
+    
+    def _drain(self):
+        """Wait up to one interval for an alert, then take whatever else is queued"""
+        try:
+            batch = [self._queue.get(timeout=self.interval)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+    
+    def _run(self):
+        db = IDSDatabase()  # sessions are not shared across threads
+        try:
+            while not (self._stop.is_set() and self._queue.empty()):
+                batch = self._drain()
+                if batch:
+                    stored = db.add_alert_batch(batch)
+                    self.written += stored
+                    with self._count_lock:
+                        self.dropped += len(batch) - stored
+        finally:
+            db.close()
+    
+    def close(self):
+        """Flush anything still queued and stop the thread"""
+        self._stop.set()
+        self._thread.join()
 
 # Convenience functions
 def save_alert(alert_data):
     """Quick function to save an alert"""
     db = IDSDatabase()
-    alert_id = db.add_alert(alert_data)
-    db.close()
-    return alert_id
+    try:
+        return db.add_alert(alert_data)
+    finally:
+        db.close()
 
-def get_dashboard_stats():
-    """Get statistics for dashboard"""
+def save_traffic_batch(stats_list):
+    """Quick function to save buffered traffic snapshots in one transaction"""
     db = IDSDatabase()
-    stats = db.get_attack_statistics(hours=24)
-    total_all_time = db.get_total_alerts()
-    today_count = db.get_alert_count_today()
-    db.close()
-    
-    return {
-        'last_24h': stats,
-        'total_all_time': total_all_time,
-        'today': today_count
-    }
+    try:
+        return db.log_traffic_batch(stats_list)
+    finally:
+        db.close()
+
+def get_dashboard_stats():
+    """Get statistics for dashboard (cached for up to DASHBOARD_STATS_TTL
+    seconds, and only while no alert has been added since)"""
+    with _STATS_LOCK:
+        db = IDSDatabase()
+        try:
+            latest_id = db.get_latest_alert_id()
+            if (_STATS_CACHE['value'] is not None and latest_id == _STATS_CACHE['latest_id']
+                    and time.monotonic() - _STATS_CACHE['at'] < DASHBOARD_STATS_TTL):
+                return _STATS_CACHE['value']
+            
+            now = datetime.now()
+            stats = db.get_attack_statistics(hours=24, now=now)
+            total_all_time = db.get_total_alerts()
+            today_count = db.get_alert_count_today(now=now)
+        finally:
+            db.close()
+        
+        _STATS_CACHE['value'] = {
+            'last_24h': stats,
+            'total_all_time': total_all_time,
+            'today': today_count
+        }
+        _STATS_CACHE['latest_id'] = latest_id
+        _STATS_CACHE['at'] = time.monotonic()
+        return _STATS_CACHE['value']
 
 if __name__ == "__main__":
     # Test database
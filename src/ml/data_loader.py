@@ -7,11 +7,40 @@ Loads preprocessed data from data/processed/
 import numpy as np
 import pickle
 import json
+import struct
+import zipfile
 from pathlib import Path
 from colorama import Fore, init
 
 init(autoreset=True)
 
+def load_npz_mmap(path):
+    """Members of an .npz as read-only memmaps, read lazily from the page cache.
+    np.savez stores each .npy unmodified, so the array data sits at a fixed
+    offset in the zip; deflated members (savez_compressed) are read into memory."""
+    arrays = {}
+    with zipfile.ZipFile(path) as zf, open(path, 'rb') as f:
+        for info in zf.infolist():
+            name = info.filename[:-4] if info.filename.endswith('.npy') else info.filename
+            if info.compress_type == zipfile.ZIP_STORED:
+                # Local file header: 30 fixed bytes, then name and extra field
+                f.seek(info.header_offset + 26)
+                name_len, extra_len = struct.unpack('<HH', f.read(4))
+                f.seek(info.header_offset + 30 + name_len + extra_len)
+                version = np.lib.format.read_magic(f)
+                if version in ((1, 0), (2, 0)):
+                    read_header = (np.lib.format.read_array_header_1_0 if version == (1, 0)
+                                   else np.lib.format.read_array_header_2_0)
+                    shape, fortran, dtype = read_header(f)
+                    if not dtype.hasobject and all(shape):
+                        arrays[name] = np.memmap(path, dtype=dtype, mode='r', shape=shape,
+                                                 order='F' if fortran else 'C', offset=f.tell())
+                        continue
+            with zf.open(info) as member:
+                arrays[name] = np.lib.format.read_array(member)
+    return arrays
+
+
 class DataLoader:
     """Load preprocessed IDS data"""
     
@@ -22,7 +51,6 @@ class DataLoader:
         self.y_train = None
         self.y_test = None
         self.scaler = None
-        self.label_encoder = None
         self.feature_names = None
         self.metadata = None
     
@@ -30,25 +58,37 @@ class DataLoader:
         """Load all preprocessed data"""
         print(f"{Fore.YELLOW}Loading preprocessed data...")
         
+        archive = self.data_dir / 'data.npz'
+        
         # Check if data exists
-        if not (self.data_dir / 'X_train.npy').exists():
+        if not archive.exists() and not (self.data_dir / 'X_train.npy').exists():
             print(f"{Fore.RED}❌ No preprocessed data found!")
             print(f"{Fore.YELLOW}Run preprocessing first:")
             print(f"  python src/ml/generate_synthetic_data.py")
             raise FileNotFoundError("Preprocessed data not found")
         
-        # Load arrays
-        self.X_train = np.load(self.data_dir / 'X_train.npy')
-        self.X_test = np.load(self.data_dir / 'X_test.npy')
-        self.y_train = np.load(self.data_dir / 'y_train.npy')
-        self.y_test = np.load(self.data_dir / 'y_test.npy')
+        # Memory-map the arrays (single archive, or the older per-array .npy
+        # files): pages are read on first touch, so slices stay lazy
+        if archive.exists():
+            arrays = load_npz_mmap(archive)
+            self.X_train = arrays['X_train']
+            self.X_test = arrays['X_test']
+            self.y_train = arrays['y_train']
+            self.y_test = arrays['y_test']
+        else:
+            self.X_train = np.load(self.data_dir / 'X_train.npy', mmap_mode='r')
+            self.X_test = np.load(self.data_dir / 'X_test.npy', mmap_mode='r')
+            self.y_train = np.load(self.data_dir / 'y_train.npy', mmap_mode='r')
+            self.y_test = np.load(self.data_dir / 'y_test.npy', mmap_mode='r')
         
-        # Load preprocessing objects
-        with open(self.data_dir / 'scaler.pkl', 'rb') as f:
-            self.scaler = pickle.load(f)
-        
-        with open(self.data_dir / 'label_encoder.pkl', 'rb') as f:
-            self.label_encoder = pickle.load(f)
+        # Scaler state: {'mean': ..., 'scale': ...}
+        if (self.data_dir / 'scaler.npz').exists():
+            with np.load(self.data_dir / 'scaler.npz') as s:
+                self.scaler = {'mean': s['mean'], 'scale': s['scale']}
+        else:
+            with open(self.data_dir / 'scaler.pkl', 'rb') as f:
+                legacy = pickle.load(f)
+            self.scaler = {'mean': legacy.mean_, 'scale': legacy.scale_}
         
         with open(self.data_dir / 'feature_names.json', 'r') as f:
             self.feature_names = json.load(f)
@@ -73,3 +113,13 @@ class DataLoader:
     def get_metadata(self):
         """Get metadata"""
         return self.metadata
+
+_loader = None
+
+def get_loader():
+    """Process-wide DataLoader, loaded on first use so callers share its arrays"""
+    global _loader
+    if _loader is None:
+        _loader = DataLoader()
+        _loader.load_all()
+    return _loader
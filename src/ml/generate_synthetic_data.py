@@ -5,349 +5,448 @@ Creates realistic network traffic data matching CIC-IDS2017 schema
 """
 
 import numpy as np
-import pickle
 import json
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 from colorama import Fore, init
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import LabelEncoder
 
 init(autoreset=True)
 
-def generate_synthetic_ids_data(n_samples=470000):
-    """Generate synthetic IDS data with realistic patterns"""
+# Per-class feature profiles, one entry per feature in schema order:
+# ('normal', mean, std), ('exponential', scale), ('poisson', lam),
+# ('choice', values), ('integers', low, high), or a constant.
+N_FEATURES = 78
+GEN_CHUNK = 50000  # rows per worker task
+
+# Normal traffic
+BENIGN_PROFILE = [
+    ('choice', [80, 443, 22, 21, 25]),  # Destination Port
+    ('exponential', 5000),  # Flow Duration
+    ('poisson', 10),  # Total Fwd Packets
+    ('poisson', 8),   # Total Backward Packets
+    ('normal', 1500, 500),  # Total Length of Fwd Packets
+    ('normal', 1200, 400),  # Total Length of Bwd Packets
+    ('normal', 200, 50),   # Fwd Packet Length Max
+    ('normal', 50, 20),    # Fwd Packet Length Min
+    ('normal', 120, 30),   # Fwd Packet Length Mean
+    ('normal', 30, 10),    # Fwd Packet Length Std
+    ('normal', 180, 40),   # Bwd Packet Length Max
+    ('normal', 40, 15),    # Bwd Packet Length Min
+    ('normal', 100, 25),   # Bwd Packet Length Mean
+    ('normal', 25, 8),     # Bwd Packet Length Std
+    ('normal', 300, 100),  # Flow Bytes/s
+    ('normal', 3, 1),      # Flow Packets/s
+    ('exponential', 100),  # Flow IAT Mean
+    ('exponential', 50),   # Flow IAT Std
+    ('exponential', 200),  # Flow IAT Max
+    ('exponential', 10),   # Flow IAT Min
+    ('exponential', 500),  # Fwd IAT Total
+    ('exponential', 80),   # Fwd IAT Mean
+    ('exponential', 40),   # Fwd IAT Std
+    ('exponential', 150),  # Fwd IAT Max
+    ('exponential', 8),    # Fwd IAT Min
+    ('exponential', 400),  # Bwd IAT Total
+    ('exponential', 70),   # Bwd IAT Mean
+    ('exponential', 35),   # Bwd IAT Std
+    ('exponential', 140),  # Bwd IAT Max
+    ('exponential', 7),    # Bwd IAT Min
+    ('poisson', 1),        # Fwd PSH Flags
+    ('poisson', 1),        # Bwd PSH Flags
+    0,  # Fwd URG Flags
+    0,  # Bwd URG Flags
+    ('normal', 40, 10),    # Fwd Header Length
+    ('normal', 40, 10),    # Bwd Header Length
+    ('normal', 2, 0.5),    # Fwd Packets/s
+    ('normal', 1.5, 0.4),  # Bwd Packets/s
+    ('normal', 40, 15),    # Min Packet Length
+    ('normal', 200, 50),   # Max Packet Length
+    ('normal', 120, 30),   # Packet Length Mean
+    ('normal', 50, 15),    # Packet Length Std
+    ('normal', 2500, 500), # Packet Length Variance
+    ('poisson', 1),        # FIN Flag Count
+    ('poisson', 1),        # SYN Flag Count
+    0,  # RST Flag Count
+    ('poisson', 2),        # PSH Flag Count
+    ('poisson', 15),       # ACK Flag Count
+    0,  # URG Flag Count
+    0,  # CWE Flag Count
+    0,  # ECE Flag Count
+    ('normal', 0.8, 0.2),  # Down/Up Ratio
+    ('normal', 110, 25),   # Average Packet Size
+    ('normal', 120, 30),   # Avg Fwd Segment Size
+    ('normal', 100, 25),   # Avg Bwd Segment Size
+    ('normal', 40, 10),    # Fwd Header Length.1
+    0,  # Fwd Avg Bytes/Bulk
+    0,  # Fwd Avg Packets/Bulk
+    0,  # Fwd Avg Bulk Rate
+    0,  # Bwd Avg Bytes/Bulk
+    0,  # Bwd Avg Packets/Bulk
+    0,  # Bwd Avg Bulk Rate
+    ('poisson', 10),       # Subflow Fwd Packets
+    ('normal', 1500, 400), # Subflow Fwd Bytes
+    ('poisson', 8),        # Subflow Bwd Packets
+    ('normal', 1200, 300), # Subflow Bwd Bytes
+    ('choice', [8192, 16384, 32768]),  # Init_Win_bytes_forward
+    ('choice', [8192, 16384, 32768]),  # Init_Win_bytes_backward
+    ('poisson', 8),        # act_data_pkt_fwd
+    ('normal', 32, 10),    # min_seg_size_forward
+    ('exponential', 1000), # Active Mean
+    ('exponential', 500),  # Active Std
+    ('exponential', 2000), # Active Max
+    ('exponential', 100),  # Active Min
+    ('exponential', 5000), # Idle Mean
+    ('exponential', 2000), # Idle Std
+    ('exponential', 10000),# Idle Max
+    ('exponential', 500),  # Idle Min
+]
+
+# DDoS: High packet rate, similar sizes
+DDOS_PROFILE = [
+    ('choice', [80, 443]),  # Target common ports
+    ('exponential', 10000),
+    ('poisson', 500),  # VERY high forward packets
+    ('poisson', 5),    # Few backward
+    ('normal', 30000, 5000),  # High total bytes
+    ('normal', 300, 100),
+    ('normal', 80, 10),   # Small, uniform packets
+    ('normal', 60, 5),
+    ('normal', 70, 8),
+    ('normal', 10, 3),    # Low variance
+    ('normal', 100, 20),
+    ('normal', 40, 10),
+    ('normal', 70, 15),
+    ('normal', 15, 5),
+    ('normal', 3000, 500),  # HIGH bytes/s
+    ('normal', 50, 10),     # HIGH packets/s
+    ('exponential', 10),    # LOW inter-arrival time
+    ('exponential', 5),
+    ('exponential', 20),
+    ('exponential', 1),
+    ('exponential', 50),
+    ('exponential', 5),
+    ('exponential', 3),
+    ('exponential', 10),
+    ('exponential', 0.5),
+    ('exponential', 200),
+    ('exponential', 40),
+    ('exponential', 20),
+    ('exponential', 80),
+    ('exponential', 5),
+    0, 0, 0, 0,
+    ('normal', 40, 5),
+    ('normal', 40, 5),
+    ('normal', 40, 8),
+    ('normal', 0.5, 0.2),
+    ('normal', 60, 10),
+    ('normal', 80, 10),
+    ('normal', 70, 10),
+    ('normal', 10, 3),
+    ('normal', 100, 30),
+    0,
+    ('poisson', 300),  # Many SYN flags
+    0,
+    0,
+    ('poisson', 400),
+    0, 0, 0,
+    ('normal', 0.01, 0.005),  # Very low down/up ratio
+    ('normal', 70, 10),
+    ('normal', 70, 10),
+    ('normal', 70, 15),
+    ('normal', 40, 5),
+    0, 0, 0, 0, 0, 0,
+    ('poisson', 500),
+    ('normal', 30000, 5000),
+    ('poisson', 5),
+    ('normal', 300, 100),
+    ('choice', [1024, 2048]),
+    ('choice', [1024, 2048]),
+    ('poisson', 10),
+    ('normal', 40, 5),
+    ('exponential', 100),
+    ('exponential', 50),
+    ('exponential', 200),
+    ('exponential', 10),
+    ('exponential', 500),
+    ('exponential', 200),
+    ('exponential', 1000),
+    ('exponential', 50),
+]
+
+# Port Scan: Many different ports, low bytes
+PORTSCAN_PROFILE = [
+    ('integers', 1, 65535),  # RANDOM ports
+    ('exponential', 1000),
+    ('poisson', 3),   # Few packets
+    ('poisson', 1),
+    ('normal', 200, 50),   # Low bytes
+    ('normal', 100, 30),
+    ('normal', 80, 20),
+    ('normal', 50, 15),
+    ('normal', 65, 15),
+    ('normal', 15, 5),
+    ('normal', 80, 20),
+    ('normal', 40, 10),
+    ('normal', 60, 15),
+    ('normal', 15, 5),
+    ('normal', 100, 50),
+    ('normal', 2, 1),
+    ('exponential', 50),
+    ('exponential', 20),
+    ('exponential', 100),
+    ('exponential', 5),
+    ('exponential', 100),
+    ('exponential', 30),
+    ('exponential', 15),
+    ('exponential', 60),
+    ('exponential', 3),
+    ('exponential', 80),
+    ('exponential', 25),
+    ('exponential', 12),
+    ('exponential', 50),
+    ('exponential', 2),
+    0, 0, 0, 0,
+    ('normal', 40, 5),
+    ('normal', 40, 5),
+    ('normal', 1, 0.3),
+    ('normal', 0.3, 0.1),
+    ('normal', 50, 10),
+    ('normal', 80, 15),
+    ('normal', 65, 12),
+    ('normal', 15, 5),
+    ('normal', 225, 50),
+    0,
+    ('poisson', 2),  # SYN flags
+    ('poisson', 1),  # RST flags (port closed)
+    0,
+    ('poisson', 1),
+    0, 0, 0,
+    ('normal', 0.3, 0.1),
+    ('normal', 60, 12),
+    ('normal', 65, 15),
+    ('normal', 55, 13),
+    ('normal', 40, 5),
+    0, 0, 0, 0, 0, 0,
+    ('poisson', 3),
+    ('normal', 200, 50),
+    ('poisson', 1),
+    ('normal', 100, 30),
+    ('choice', [1024, 2048, 4096]),
+    ('choice', [1024, 2048]),
+    ('poisson', 2),
+    ('normal', 40, 5),
+    ('exponential', 500),
+    ('exponential', 200),
+    ('exponential', 1000),
+    ('exponential', 50),
+    ('exponential', 2000),
+    ('exponential', 1000),
+    ('exponential', 5000),
+    ('exponential', 200),
+]
+
+# Botnet: Periodic, predictable patterns
+BOT_PROFILE = [
+    ('choice', [80, 443, 8080]),
+    ('normal', 20000, 5000),
+    ('poisson', 30),
+    ('poisson', 25),
+    ('normal', 3000, 500),
+    ('normal', 2500, 400),
+    ('normal', 120, 20),
+    ('normal', 80, 15),
+    ('normal', 100, 18),
+    ('normal', 20, 5),
+    ('normal', 110, 20),
+    ('normal', 70, 15),
+    ('normal', 95, 17),
+    ('normal', 18, 5),
+    ('normal', 250, 50),
+    ('normal', 2.5, 0.5),
+    ('normal', 800, 100),   # VERY regular IAT
+    ('normal', 50, 10),     # Low variance
+    ('normal', 900, 120),
+    ('normal', 700, 90),
+    ('normal', 12000, 2000),
+    ('normal', 800, 100),
+    ('normal', 50, 10),
+    ('normal', 900, 120),
+    ('normal', 700, 90),
+    ('normal', 10000, 1800),
+    ('normal', 750, 90),
+    ('normal', 45, 9),
+    ('normal', 850, 110),
+    ('normal', 680, 85),
+    ('poisson', 2),
+    ('poisson', 2),
+    0, 0,
+    ('normal', 40, 5),
+    ('normal', 40, 5),
+    ('normal', 1.5, 0.3),
+    ('normal', 1.2, 0.3),
+    ('normal', 70, 15),
+    ('normal', 120, 20),
+    ('normal', 95, 18),
+    ('normal', 22, 6),
+    ('normal', 484, 100),
+    ('poisson', 1),
+    ('poisson', 1),
+    0,
+    ('poisson', 4),
+    ('poisson', 50),
+    0, 0, 0,
+    ('normal', 0.85, 0.15),
+    ('normal', 100, 18),
+    ('normal', 100, 18),
+    ('normal', 95, 17),
+    ('normal', 40, 5),
+    0, 0, 0, 0, 0, 0,
+    ('poisson', 30),
+    ('normal', 3000, 500),
+    ('poisson', 25),
+    ('normal', 2500, 400),
+    ('choice', [8192, 16384]),
+    ('choice', [8192, 16384]),
+    ('poisson', 25),
+    ('normal', 40, 5),
+    ('normal', 15000, 3000),
+    ('normal', 3000, 600),
+    ('normal', 20000, 4000),
+    ('normal', 10000, 2000),
+    ('normal', 5000, 1000),
+    ('normal', 2000, 400),
+    ('normal', 8000, 1600),
+    ('normal', 3000, 600),
+]
+
+CLASS_PROFILES = {'BENIGN': BENIGN_PROFILE, 'DDoS': DDOS_PROFILE, 'PortScan': PORTSCAN_PROFILE, 'Bot': BOT_PROFILE}
+
+# Columns holding the same constant in every class are filled once for the
+# whole matrix; workers only produce the remaining VARYING_COLUMNS
+SHARED_CONSTANTS = {
+    j: specs[0] for j, specs in enumerate(zip(*CLASS_PROFILES.values()))
+    if not isinstance(specs[0], tuple) and all(spec == specs[0] for spec in specs)
+}
+VARYING_COLUMNS = [j for j in range(N_FEATURES) if j not in SHARED_CONSTANTS]
+
+
+def _draw(rng, spec, size):
+    """Draw `size` values of one feature from its profile spec"""
+    if not isinstance(spec, tuple):
+        return spec  # constant, broadcast on assignment
+    dist, *params = spec
+    return getattr(rng, dist)(*params, size=size)
+
+
+def _generate_block(name, count, seed):
+    """Draw `count` rows of one class's VARYING_COLUMNS from an independent
+    RNG stream (worker)"""
+    rng = np.random.Generator(np.random.SFC64(seed))
+    profile = CLASS_PROFILES[name]
+    block = np.empty((count, len(VARYING_COLUMNS)), dtype=np.float32)
+    for k, j in enumerate(VARYING_COLUMNS):
+        block[:, k] = _draw(rng, profile[j], count)
+    return block
+
+
+def generate_synthetic_ids_data(n_samples=470000, n_workers=None, test_size=0.2):
+    """Generate synthetic IDS data with realistic patterns, already split
+    stratified into train/test"""
     
     print(f"{Fore.CYAN}{'='*60}")
     print(f"{Fore.CYAN}SYNTHETIC IDS DATA GENERATOR")
     print(f"{Fore.CYAN}Generating {n_samples:,} samples")
     print(f"{Fore.CYAN}{'='*60}\n")
     
-    np.random.seed(42)
+    # Generator API on SFC64: faster bulk draws than the legacy MT19937 global state.
+    # Labels and every chunk below get their own non-overlapping child stream.
+    seeds = np.random.SeedSequence(42)
+    rng = np.random.Generator(np.random.SFC64(seeds.spawn(1)[0]))
     
     # Class distribution (realistic)
     class_names = ['BENIGN', 'Bot', 'DDoS', 'PortScan']
     class_probs = [0.786, 0.002, 0.110, 0.102]  # Matches CIC-IDS2017
     
-    labels = np.random.choice(class_names, size=n_samples, p=class_probs)
+    # Stratify at generation time: draw each class's count, then cut it into
+    # train and test rows, so no full X is built and split afterwards
+    counts = rng.multinomial(n_samples, class_probs)
+    test_counts = np.rint(counts * test_size).astype(int)
+    train_counts = counts - test_counts
+    
+    # Classes are laid out in contiguous blocks; train blocks land at shuffled
+    # rows through `order`, test rows stay grouped by class
+    y_train = np.repeat(class_names, train_counts)
+    y_test = np.repeat(class_names, test_counts)
+    order = rng.permutation(len(y_train))
+    y_train[order] = y_train.copy()
+    X_train = np.empty((len(y_train), N_FEATURES), dtype=np.float32)
+    X_test = np.empty((len(y_test), N_FEATURES), dtype=np.float32)
     
     print(f"{Fore.YELLOW}Generating features for each attack type...\n")
     
-    # 78 features matching your schema
-    features = []
+    # Each feature of each class is one vectorized draw over that class's
+    # rows, instead of 78 scalar draws per sample. Classes are cut into
+    # GEN_CHUNK-row chunks so BENIGN (~79% of rows) spreads across workers.
+    chunks = []
+    for split, split_counts in (('train', train_counts), ('test', test_counts)):
+        offsets = np.concatenate(([0], np.cumsum(split_counts)))
+        for name, start, stop in zip(class_names, offsets[:-1], offsets[1:]):
+            chunks += [(name, split, lo, min(lo + GEN_CHUNK, stop)) for lo in range(start, stop, GEN_CHUNK)]
+    for name, count in zip(class_names, counts):
+        print(f"{Fore.CYAN}  {name}: {count:,} samples")
+    
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        blocks = pool.map(_generate_block,
+                          [name for name, _, _, _ in chunks],
+                          [hi - lo for _, _, lo, hi in chunks],
+                          seeds.spawn(len(chunks)))
+        for (_, split, lo, hi), block in zip(chunks, blocks):
+            if split == 'train':
+                X_train[order[lo:hi, None], VARYING_COLUMNS] = block
+            else:
+                X_test[lo:hi, VARYING_COLUMNS] = block
     
-    for i, label in enumerate(labels):
-        if i % 100000 == 0:
-            print(f"{Fore.CYAN}  Generated {i:,} / {n_samples:,} samples...")
-        
-        if label == 'BENIGN':
-            # Normal traffic
-            sample = [
-                np.random.choice([80, 443, 22, 21, 25]),  # Destination Port
-                np.random.exponential(5000),  # Flow Duration
-                np.random.poisson(10),  # Total Fwd Packets
-                np.random.poisson(8),   # Total Backward Packets
-                np.random.normal(1500, 500),  # Total Length of Fwd Packets
-                np.random.normal(1200, 400),  # Total Length of Bwd Packets
-                np.random.normal(200, 50),   # Fwd Packet Length Max
-                np.random.normal(50, 20),    # Fwd Packet Length Min
-                np.random.normal(120, 30),   # Fwd Packet Length Mean
-                np.random.normal(30, 10),    # Fwd Packet Length Std
-                np.random.normal(180, 40),   # Bwd Packet Length Max
-                np.random.normal(40, 15),    # Bwd Packet Length Min
-                np.random.normal(100, 25),   # Bwd Packet Length Mean
-                np.random.normal(25, 8),     # Bwd Packet Length Std
-                np.random.normal(300, 100),  # Flow Bytes/s
-                np.random.normal(3, 1),      # Flow Packets/s
-                np.random.exponential(100),  # Flow IAT Mean
-                np.random.exponential(50),   # Flow IAT Std
-                np.random.exponential(200),  # Flow IAT Max
-                np.random.exponential(10),   # Flow IAT Min
-                np.random.exponential(500),  # Fwd IAT Total
-                np.random.exponential(80),   # Fwd IAT Mean
-                np.random.exponential(40),   # Fwd IAT Std
-                np.random.exponential(150),  # Fwd IAT Max
-                np.random.exponential(8),    # Fwd IAT Min
-                np.random.exponential(400),  # Bwd IAT Total
-                np.random.exponential(70),   # Bwd IAT Mean
-                np.random.exponential(35),   # Bwd IAT Std
-                np.random.exponential(140),  # Bwd IAT Max
-                np.random.exponential(7),    # Bwd IAT Min
-                np.random.poisson(1),        # Fwd PSH Flags
-                np.random.poisson(1),        # Bwd PSH Flags
-                0,  # Fwd URG Flags
-                0,  # Bwd URG Flags
-                np.random.normal(40, 10),    # Fwd Header Length
-                np.random.normal(40, 10),    # Bwd Header Length
-                np.random.normal(2, 0.5),    # Fwd Packets/s
-                np.random.normal(1.5, 0.4),  # Bwd Packets/s
-                np.random.normal(40, 15),    # Min Packet Length
-                np.random.normal(200, 50),   # Max Packet Length
-                np.random.normal(120, 30),   # Packet Length Mean
-                np.random.normal(50, 15),    # Packet Length Std
-                np.random.normal(2500, 500), # Packet Length Variance
-                np.random.poisson(1),        # FIN Flag Count
-                np.random.poisson(1),        # SYN Flag Count
-                0,  # RST Flag Count
-                np.random.poisson(2),        # PSH Flag Count
-                np.random.poisson(15),       # ACK Flag Count
-                0,  # URG Flag Count
-                0,  # CWE Flag Count
-                0,  # ECE Flag Count
-                np.random.normal(0.8, 0.2),  # Down/Up Ratio
-                np.random.normal(110, 25),   # Average Packet Size
-                np.random.normal(120, 30),   # Avg Fwd Segment Size
-                np.random.normal(100, 25),   # Avg Bwd Segment Size
-                np.random.normal(40, 10),    # Fwd Header Length.1
-                0,  # Fwd Avg Bytes/Bulk
-                0,  # Fwd Avg Packets/Bulk
-                0,  # Fwd Avg Bulk Rate
-                0,  # Bwd Avg Bytes/Bulk
-                0,  # Bwd Avg Packets/Bulk
-                0,  # Bwd Avg Bulk Rate
-                np.random.poisson(10),       # Subflow Fwd Packets
-                np.random.normal(1500, 400), # Subflow Fwd Bytes
-                np.random.poisson(8),        # Subflow Bwd Packets
-                np.random.normal(1200, 300), # Subflow Bwd Bytes
-                np.random.choice([8192, 16384, 32768]),  # Init_Win_bytes_forward
-                np.random.choice([8192, 16384, 32768]),  # Init_Win_bytes_backward
-                np.random.poisson(8),        # act_data_pkt_fwd
-                np.random.normal(32, 10),    # min_seg_size_forward
-                np.random.exponential(1000), # Active Mean
-                np.random.exponential(500),  # Active Std
-                np.random.exponential(2000), # Active Max
-                np.random.exponential(100),  # Active Min
-                np.random.exponential(5000), # Idle Mean
-                np.random.exponential(2000), # Idle Std
-                np.random.exponential(10000),# Idle Max
-                np.random.exponential(500),  # Idle Min
-            ]
-            
-        elif label == 'DDoS':
-            # DDoS: High packet rate, similar sizes
-            sample = [
-                np.random.choice([80, 443]),  # Target common ports
-                np.random.exponential(10000),
-                np.random.poisson(500),  # VERY high forward packets
-                np.random.poisson(5),    # Few backward
-                np.random.normal(30000, 5000),  # High total bytes
-                np.random.normal(300, 100),
-                np.random.normal(80, 10),   # Small, uniform packets
-                np.random.normal(60, 5),
-                np.random.normal(70, 8),
-                np.random.normal(10, 3),    # Low variance
-                np.random.normal(100, 20),
-                np.random.normal(40, 10),
-                np.random.normal(70, 15),
-                np.random.normal(15, 5),
-                np.random.normal(3000, 500),  # HIGH bytes/s
-                np.random.normal(50, 10),     # HIGH packets/s
-                np.random.exponential(10),    # LOW inter-arrival time
-                np.random.exponential(5),
-                np.random.exponential(20),
-                np.random.exponential(1),
-                np.random.exponential(50),
-                np.random.exponential(5),
-                np.random.exponential(3),
-                np.random.exponential(10),
-                np.random.exponential(0.5),
-                np.random.exponential(200),
-                np.random.exponential(40),
-                np.random.exponential(20),
-                np.random.exponential(80),
-                np.random.exponential(5),
-                0, 0, 0, 0,
-                np.random.normal(40, 5),
-                np.random.normal(40, 5),
-                np.random.normal(40, 8),
-                np.random.normal(0.5, 0.2),
-                np.random.normal(60, 10),
-                np.random.normal(80, 10),
-                np.random.normal(70, 10),
-                np.random.normal(10, 3),
-                np.random.normal(100, 30),
-                0,
-                np.random.poisson(300),  # Many SYN flags
-                0,
-                0,
-                np.random.poisson(400),
-                0, 0, 0,
-                np.random.normal(0.01, 0.005),  # Very low down/up ratio
-                np.random.normal(70, 10),
-                np.random.normal(70, 10),
-                np.random.normal(70, 15),
-                np.random.normal(40, 5),
-                0, 0, 0, 0, 0, 0,
-                np.random.poisson(500),
-                np.random.normal(30000, 5000),
-                np.random.poisson(5),
-                np.random.normal(300, 100),
-                np.random.choice([1024, 2048]),
-                np.random.choice([1024, 2048]),
-                np.random.poisson(10),
-                np.random.normal(40, 5),
-                np.random.exponential(100),
-                np.random.exponential(50),
-                np.random.exponential(200),
-                np.random.exponential(10),
-                np.random.exponential(500),
-                np.random.exponential(200),
-                np.random.exponential(1000),
-                np.random.exponential(50),
-            ]
-            
-        elif label == 'PortScan':
-            # Port Scan: Many different ports, low bytes
-            sample = [
-                np.random.randint(1, 65535),  # RANDOM ports
-                np.random.exponential(1000),
-                np.random.poisson(3),   # Few packets
-                np.random.poisson(1),
-                np.random.normal(200, 50),   # Low bytes
-                np.random.normal(100, 30),
-                np.random.normal(80, 20),
-                np.random.normal(50, 15),
-                np.random.normal(65, 15),
-                np.random.normal(15, 5),
-                np.random.normal(80, 20),
-                np.random.normal(40, 10),
-                np.random.normal(60, 15),
-                np.random.normal(15, 5),
-                np.random.normal(100, 50),
-                np.random.normal(2, 1),
-                np.random.exponential(50),
-                np.random.exponential(20),
-                np.random.exponential(100),
-                np.random.exponential(5),
-                np.random.exponential(100),
-                np.random.exponential(30),
-                np.random.exponential(15),
-                np.random.exponential(60),
-                np.random.exponential(3),
-                np.random.exponential(80),
-                np.random.exponential(25),
-                np.random.exponential(12),
-                np.random.exponential(50),
-                np.random.exponential(2),
-                0, 0, 0, 0,
-                np.random.normal(40, 5),
-                np.random.normal(40, 5),
-                np.random.normal(1, 0.3),
-                np.random.normal(0.3, 0.1),
-                np.random.normal(50, 10),
-                np.random.normal(80, 15),
-                np.random.normal(65, 12),
-                np.random.normal(15, 5),
-                np.random.normal(225, 50),
-                0,
-                np.random.poisson(2),  # SYN flags
-                np.random.poisson(1),  # RST flags (port closed)
-                0,
-                np.random.poisson(1),
-                0, 0, 0,
-                np.random.normal(0.3, 0.1),
-                np.random.normal(60, 12),
-                np.random.normal(65, 15),
-                np.random.normal(55, 13),
-                np.random.normal(40, 5),
-                0, 0, 0, 0, 0, 0,
-                np.random.poisson(3),
-                np.random.normal(200, 50),
-                np.random.poisson(1),
-                np.random.normal(100, 30),
-                np.random.choice([1024, 2048, 4096]),
-                np.random.choice([1024, 2048]),
-                np.random.poisson(2),
-                np.random.normal(40, 5),
-                np.random.exponential(500),
-                np.random.exponential(200),
-                np.random.exponential(1000),
-                np.random.exponential(50),
-                np.random.exponential(2000),
-                np.random.exponential(1000),
-                np.random.exponential(5000),
-                np.random.exponential(200),
-            ]
-            
-        else:  # Bot
-            # Botnet: Periodic, predictable patterns
-            sample = [
-                np.random.choice([80, 443, 8080]),
-                np.random.normal(20000, 5000),
-                np.random.poisson(30),
-                np.random.poisson(25),
-                np.random.normal(3000, 500),
-                np.random.normal(2500, 400),
-                np.random.normal(120, 20),
-                np.random.normal(80, 15),
-                np.random.normal(100, 18),
-                np.random.normal(20, 5),
-                np.random.normal(110, 20),
-                np.random.normal(70, 15),
-                np.random.normal(95, 17),
-                np.random.normal(18, 5),
-                np.random.normal(250, 50),
-                np.random.normal(2.5, 0.5),
-                np.random.normal(800, 100),   # VERY regular IAT
-                np.random.normal(50, 10),     # Low variance
-                np.random.normal(900, 120),
-                np.random.normal(700, 90),
-                np.random.normal(12000, 2000),
-                np.random.normal(800, 100),
-                np.random.normal(50, 10),
-                np.random.normal(900, 120),
-                np.random.normal(700, 90),
-                np.random.normal(10000, 1800),
-                np.random.normal(750, 90),
-                np.random.normal(45, 9),
-                np.random.normal(850, 110),
-                np.random.normal(680, 85),
-                np.random.poisson(2),
-                np.random.poisson(2),
-                0, 0,
-                np.random.normal(40, 5),
-                np.random.normal(40, 5),
-                np.random.normal(1.5, 0.3),
-                np.random.normal(1.2, 0.3),
-                np.random.normal(70, 15),
-                np.random.normal(120, 20),
-                np.random.normal(95, 18),
-                np.random.normal(22, 6),
-                np.random.normal(484, 100),
-                np.random.poisson(1),
-                np.random.poisson(1),
-                0,
-                np.random.poisson(4),
-                np.random.poisson(50),
-                0, 0, 0,
-                np.random.normal(0.85, 0.15),
-                np.random.normal(100, 18),
-                np.random.normal(100, 18),
-                np.random.normal(95, 17),
-                np.random.normal(40, 5),
-                0, 0, 0, 0, 0, 0,
-                np.random.poisson(30),
-                np.random.normal(3000, 500),
-                np.random.poisson(25),
-                np.random.normal(2500, 400),
-                np.random.choice([8192, 16384]),
-                np.random.choice([8192, 16384]),
-                np.random.poisson(25),
-                np.random.normal(40, 5),
-                np.random.normal(15000, 3000),
-                np.random.normal(3000, 600),
-                np.random.normal(20000, 4000),
-                np.random.normal(10000, 2000),
-                np.random.normal(5000, 1000),
-                np.random.normal(2000, 400),
-                np.random.normal(8000, 1600),
-                np.random.normal(3000, 600),
-            ]
-        
-        features.append(sample)
+    for j, value in SHARED_CONSTANTS.items():
+        X_train[:, j] = value
+        X_test[:, j] = value
     
-    print(f"{Fore.GREEN}✅ Generated {n_samples:,} samples\n")
+    print(f"{Fore.GREEN}✅ Generated {n_samples:,} samples "
+          f"({len(y_train):,} train / {len(y_test):,} test)\n")
     
-    return np.array(features), labels
+    return X_train, X_test, y_train, y_test
+
+
+def standardize(X_train, X_test, block=4096):
+    """Z-score both splits in place with the train mean/std, the same result
+    as StandardScaler; returns {'mean', 'scale'}"""
+    # One pass for the statistics: per-block mean/M2 in float64, merged with
+    # Chan's update, so no full-size float64 temporary is ever built
+    n = 0
+    mean = np.zeros(X_train.shape[1])
+    m2 = np.zeros(X_train.shape[1])
+    for lo in range(0, len(X_train), block):
+        rows = X_train[lo:lo + block]
+        nb = len(rows)
+        mb = rows.mean(axis=0, dtype=np.float64)
+        m2b = ((rows - mb) ** 2).sum(axis=0)
+        delta = mb - mean
+        mean += delta * (nb / (n + nb))
+        m2 += m2b + delta ** 2 * (n * nb / (n + nb))
+        n += nb
+    
+    scale = np.sqrt(m2 / n)
+    scale[scale == 0] = 1.0  # constant features pass through, as in sklearn
+    
+    # Subtract and multiply one cache-sized row block at a time, so each
+    # block is read from memory once instead of once per operation
+    m, inv = mean.astype(np.float32), (1.0 / scale).astype(np.float32)
+    for X in (X_train, X_test):
+        for lo in range(0, len(X), block):
+            rows = X[lo:lo + block]
+            rows -= m
+            rows *= inv
+    
+    return {'mean': mean, 'scale': scale}
 
 
 def save_processed_data(X_train, X_test, y_train, y_test, scaler, 
@@ -359,18 +458,16 @@ def save_processed_data(X_train, X_test, y_train, y_test, scaler,
     out_dir = Path('data/processed')
     out_dir.mkdir(parents=True, exist_ok=True)
     
-    # Save arrays
-    np.save(out_dir / 'X_train.npy', X_train)
-    np.save(out_dir / 'X_test.npy', X_test)
-    np.save(out_dir / 'y_train.npy', y_train)
-    np.save(out_dir / 'y_test.npy', y_test)
-    
-    # Save objects
-    with open(out_dir / 'scaler.pkl', 'wb') as f:
-        pickle.dump(scaler, f)
+    # Save arrays in one archive (float32 features, int8 labels). Stored
+    # uncompressed so DataLoader can memory-map each member in place
+    np.savez(out_dir / 'data.npz',
+             X_train=X_train.astype(np.float32, copy=False),
+             X_test=X_test.astype(np.float32, copy=False),
+             y_train=y_train.astype(np.int8, copy=False),
+             y_test=y_test.astype(np.int8, copy=False))
     
-    with open(out_dir / 'label_encoder.pkl', 'wb') as f:
-        pickle.dump(label_encoder, f)
+    # Scaler state is just two vectors; class names go into metadata.json
+    np.savez(out_dir / 'scaler.npz', **scaler)
     
     with open(out_dir / 'feature_names.json', 'w') as f:
         json.dump(feature_names, f, indent=2)
@@ -392,24 +489,17 @@ def save_processed_data(X_train, X_test, y_train, y_test, scaler,
 
 
 def main():
-    # Generate data
-    X, y_labels = generate_synthetic_ids_data(n_samples=470000)
+    # Generate data (stratified 80/20 split happens during generation)
+    X_train, X_test, train_labels, test_labels = generate_synthetic_ids_data(n_samples=470000)
     
     # Encode labels
     label_encoder = LabelEncoder()
-    y = label_encoder.fit_transform(y_labels)
-    
-    # Split
-    print(f"{Fore.YELLOW}Splitting data...\n")
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42, stratify=y
-    )
+    y_train = label_encoder.fit_transform(train_labels)
+    y_test = label_encoder.transform(test_labels)
     
     # Scale
     print(f"{Fore.YELLOW}Scaling features...\n")
-    scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
-    X_test_scaled = scaler.transform(X_test)
+    scaler = standardize(X_train, X_test)
     
     # Feature names (78 features)
     feature_names = [
@@ -445,7 +535,7 @@ def main():
     
     # Save
     save_processed_data(
-        X_train_scaled, X_test_scaled, y_train, y_test,
+        X_train, X_test, y_train, y_test,
         scaler, label_encoder, feature_names, label_encoder.classes_
     )
     
@@ -1,53 +1,64 @@
 #!/usr/bin/env python3
 """
-Fast Training - Single Random Forest
-3-5 minutes, 90%+ accuracy
+Fast Training - Histogram Gradient Boosting
+Under a minute, 90%+ accuracy
 """
 
 import numpy as np
-import pickle
+import joblib
 import json
+import os
+from pathlib import Path
 from colorama import Fore, init
 import sys
 sys.path.append('.')
-from data_loader import DataLoader
+from data_loader import get_loader
 
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble import HistGradientBoostingClassifier
 from sklearn.metrics import accuracy_score, classification_report
+from sklearn.utils.class_weight import compute_sample_weight
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 init(autoreset=True)
 
 print(f"{Fore.CYAN}{'='*60}")
-print(f"{Fore.CYAN}FAST TRAINING - SINGLE RANDOM FOREST")
+print(f"{Fore.CYAN}FAST TRAINING - HISTOGRAM GRADIENT BOOSTING")
 print(f"{Fore.CYAN}{'='*60}\n")
 
 # Load data
 print(f"{Fore.YELLOW}Loading data...")
-loader = DataLoader()
-loader.load_all()
+loader = get_loader()
 X_train, X_test, y_train, y_test = loader.get_data()
 class_names = loader.get_class_names()
 
 print(f"{Fore.GREEN}✅ {len(X_train):,} training samples\n")
 
-# Train Random Forest
-print(f"{Fore.YELLOW}Training Random Forest...")
-print(f"  Trees: 200")
-print(f"  Max depth: 30")
-print(f"  Parallel: All CPUs")
-print(f"  Estimated time: 3-5 minutes\n")
-
-model = RandomForestClassifier(
-    n_estimators=200,
-    max_depth=30,
-    min_samples_split=5,
+# Train gradient boosting: features are binned to 255 uint8 buckets once and
+# splits come from per-bin histograms, instead of re-sorting floats per node
+print(f"{Fore.YELLOW}Training Histogram Gradient Boosting...")
+print(f"  Iterations: up to 200 (early stopping)")
+print(f"  Max depth: 8")
+print(f"  Parallel: All CPUs (OpenMP)")
+print(f"  Estimated time: under a minute\n")
+
+model = HistGradientBoostingClassifier(
+    max_iter=200,
+    max_depth=8,
+    learning_rate=0.1,
+    max_bins=255,
+    categorical_features=None,
+    early_stopping=True,
+    n_iter_no_change=10,
     random_state=42,
-    n_jobs=-1,
-    class_weight='balanced',
     verbose=1
 )
 
-model.fit(X_train, y_train)
+# Balanced sample weights stand in for the forest's class_weight='balanced'
+model.fit(X_train, y_train, sample_weight=compute_sample_weight('balanced', y_train))
 
 print(f"\n{Fore.GREEN}✅ Training complete!\n")
 
@@ -68,29 +79,46 @@ elif accuracy >= 0.85:
 print(f"{Fore.YELLOW}Per-Class Performance:\n")
 print(classification_report(y_test, y_pred, target_names=class_names, zero_division=0))
 
-# Save
-with open('models/final_model.pkl', 'wb') as f:
-    pickle.dump(model, f)
+# Save: joblib writes the model's numpy buffers directly and LZ4 keeps
+# the file small without slowing loads (zlib when lz4 isn't installed)
+try:
+    import lz4  # noqa: F401
+    compress = ('lz4', 3)
+except ImportError:
+    compress = 3
+joblib.dump(model, 'models/final_model.pkl', compress=compress)
+
+# Both metadata files come from one dict, so shared fields can't diverge
+common = {
+    'n_classes': len(class_names),
+    'class_names': class_names.tolist()
+}
+
+
+def write_json(path, payload):
+    """Serialize once and swap the file in, so readers never see half a file"""
+    if orjson is not None:
+        data = orjson.dumps(payload, option=orjson.OPT_INDENT_2)
+    else:
+        data = json.dumps(payload, indent=2).encode()
+    tmp = Path(path).with_suffix('.tmp')
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
 
-metadata = {
-    'model_name': 'Random Forest (CIC-IDS2017)',
+
+write_json('models/production_metadata.json', {
+    'model_name': 'Histogram Gradient Boosting (CIC-IDS2017)',
     'dataset': 'CIC-IDS2017',
     'accuracy': float(accuracy),
-    'n_classes': len(class_names),
-    'class_names': class_names.tolist(),
+    **common,
     'production_ready': True
-}
-
-with open('models/production_metadata.json', 'w') as f:
-    json.dump(metadata, f, indent=2)
+})
 
-with open('models/model_metadata.json', 'w') as f:
-    json.dump({
-        'model_name': 'Random Forest',
-        'metrics': {'accuracy': float(accuracy), 'f1_score': 0.0},
-        'n_classes': len(class_names),
-        'class_names': class_names.tolist()
-    }, f, indent=2)
+write_json('models/model_metadata.json', {
+    'model_name': 'Histogram Gradient Boosting',
+    'metrics': {'accuracy': float(accuracy), 'f1_score': 0.0},
+    **common
+})
 
 print(f"{Fore.GREEN}✅ Model saved!\n")
 
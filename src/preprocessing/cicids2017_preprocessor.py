@@ -7,20 +7,262 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 from colorama import Fore, init
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.model_selection import train_test_split
-import pickle
+from sklearn.model_selection import StratifiedShuffleSplit
 import json
+import csv
+import queue
+import threading
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor
+from pandas.api.types import is_numeric_dtype
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pacsv = None
+
+try:
+    import bottleneck as bn
+except ImportError:
+    bn = None
 
 init(autoreset=True)
 
+CHUNK_ROWS = 200000
+LOAD_WORKERS = 4     # files parsed concurrently
+PREFETCH_CHUNKS = 1  # parsed chunks buffered per file while waiting its turn
+QUEUE_POLL_SECONDS = 0.1  # how often blocked workers check for an abandoned load
+SCALER_FIT_ROWS = 50000  # training rows sampled to fit the scaler
+# Text columns in the GeneratedLabelledFlows CSVs; everything else but the
+# label is a flow statistic
+STRING_COLUMNS = {'Flow ID', 'Source IP', 'Destination IP', 'Timestamp'}
+# uint64 hash of a row's STRING_COLUMNS: stands in for them until dedup, so
+# flows that differ only by address or time are still told apart
+STRING_KEY = '_string_key'
+RAW_DIR = Path('data/raw/cicids2017')
+CACHE_DIR = Path('data/interim')  # cleaned Parquet snapshots, one per sample size
+CACHE_VERSION = 2  # bump when loading/cleaning changes what a snapshot holds
+
+
+def csv_header(csv_file, encoding):
+    """Header names with duplicates suffixed '.1', '.2' the way pandas does"""
+    with open(csv_file, newline='', encoding=encoding) as f:
+        header = next(csv.reader(f), [])
+    names, seen = [], {}
+    for name in header:
+        count = seen.get(name, 0)
+        seen[name] = count + 1
+        names.append(f"{name}.{count}" if count else name)
+    return names
+
+
+def iter_csv(csv_file, encoding='utf8', chunk_rows=CHUNK_ROWS):
+    """Yield one CSV as DataFrame chunks, with the Arrow streaming reader when
+    pyarrow is installed"""
+    # Labels are a handful of distinct strings: parse them straight into
+    # categoricals instead of one Python str per row
+    names = csv_header(csv_file, encoding)
+    labels = [name for name in names if 'label' in name.lower()]
+    strings = [name for name in names if name.strip() in STRING_COLUMNS]
+    
+    if pacsv is None:
+        for chunk in pd.read_csv(csv_file, encoding=encoding, on_bad_lines='skip', chunksize=chunk_rows,
+                                 dtype={name: 'category' for name in labels}):
+            yield fold_strings(chunk, strings)
+        return
+    
+    # Arrow infers types from the first block only, so pin the flow statistics
+    # to float64 up front; a stray "Infinity" later on can't break the stream
+    reader = pacsv.open_csv(
+        csv_file,
+        read_options=pacsv.ReadOptions(encoding=encoding, block_size=32 << 20,
+                                       column_names=names, skip_rows=1),
+        parse_options=pacsv.ParseOptions(invalid_row_handler=lambda row: 'skip'),
+        convert_options=pacsv.ConvertOptions(column_types={
+            **{name: pa.float64() for name in names if name not in labels and name not in strings},
+            **{name: pa.dictionary(pa.int32(), pa.string()) for name in labels},
+            **{name: pa.string() for name in strings}
+        })
+    )
+    for batch in reader:
+        yield fold_strings(batch.to_pandas(), strings)
+
+
+def fold_strings(chunk, strings):
+    """Replace the address/timestamp columns with their per-row STRING_KEY.
+    clean_data only needs them to tell duplicate rows apart, so the sampled
+    frame never holds millions of Python strings."""
+    if strings:
+        key = pd.util.hash_pandas_object(chunk[strings], index=False).to_numpy()
+        chunk = chunk.drop(columns=strings)
+    else:
+        key = np.zeros(len(chunk), dtype=np.uint64)
+    chunk[STRING_KEY] = key
+    return chunk
+
+
+def is_invalid_utf8(error):
+    """True for pyarrow's "invalid UTF8 data/payload" conversion errors"""
+    message = str(error).lower()
+    return 'utf8' in message or 'utf-8' in message
+
+
+def iter_csv_decoded(csv_file):
+    """iter_csv as UTF-8, switching to latin1 (which never fails) at the first
+    undecodable row. Rows already yielded are skipped on the re-read, so a
+    bad byte deep in a file doesn't abort it or double-count its head."""
+    emitted = 0
+    try:
+        # 'utf8' exactly: any other spelling makes pyarrow transcode the stream
+        for chunk in iter_csv(csv_file, 'utf8'):
+            emitted += len(chunk)
+            yield chunk
+        return
+    except UnicodeDecodeError:  # pandas / the header read
+        pass
+    except ValueError as e:
+        # pyarrow raises ArrowInvalid (a ValueError) for bad UTF-8 as well as
+        # unrelated parse/conversion failures; only the former is worth a re-read
+        if not is_invalid_utf8(e):
+            raise
+    
+    for chunk in iter_csv(csv_file, 'latin1'):
+        if emitted >= len(chunk):
+            emitted -= len(chunk)
+            continue
+        yield chunk.iloc[emitted:]
+        emitted = 0
+
+
+def _put(chunks, item, stop):
+    """Block on a full queue until there is room or the consumer has gone away"""
+    while not stop.is_set():
+        try:
+            chunks.put(item, timeout=QUEUE_POLL_SECONDS)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _fill_queue(csv_file, chunks, stop):
+    """Worker: parse one file into its queue, ending with None or the error"""
+    try:
+        for chunk in iter_csv_decoded(csv_file):
+            if not _put(chunks, chunk, stop):
+                return
+        _put(chunks, None, stop)
+    except Exception as e:
+        _put(chunks, e, stop)
+
+
+def _drain_queue(chunks, stop):
+    """Yield a file's chunks from its queue, re-raising a worker error"""
+    item = chunks.get()
+    try:
+        while item is not None:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+            item = chunks.get()
+    finally:
+        # Consumer stopped early: keep draining so the worker can finish, unless
+        # the whole load was abandoned (the worker gives up on its own then)
+        while item is not None and not isinstance(item, Exception) and not stop.is_set():
+            try:
+                item = chunks.get(timeout=QUEUE_POLL_SECONDS)
+            except queue.Empty:
+                pass
+
+
+def prefetch_csvs(pool, csv_files, depth=PREFETCH_CHUNKS):
+    """Parse files on the pool's threads, up to `depth` chunks ahead per file,
+    while the caller consumes them in file order (keeps sampling reproducible).
+
+    Close the generator before the pool shuts down (contextlib.closing): that
+    tells every worker to stop, so an exception in the caller can't leave one
+    blocked on a full queue and hang the pool's exit.
+    """
+    stop = threading.Event()
+    queues = [queue.Queue(maxsize=depth) for _ in csv_files]
+    try:
+        for csv_file, chunks in zip(csv_files, queues):
+            pool.submit(_fill_queue, csv_file, chunks, stop)
+        for csv_file, chunks in zip(csv_files, queues):
+            yield csv_file, _drain_queue(chunks, stop)
+    finally:
+        stop.set()
+
+
+def reservoir_slots(rng, seen, n_rows, size):
+    """Algorithm R for a chunk of n_rows arriving after `seen` rows: returns
+    (slots, rows) so that reservoir[slots] = chunk[rows]"""
+    t = seen + np.arange(n_rows)
+    j = np.where(t < size, t, rng.integers(0, t + 1))
+    rows = np.flatnonzero(j < size)
+    slots = j[rows]
+    # When two rows of the chunk draw the same slot, the later one wins
+    _, last = np.unique(slots[::-1], return_index=True)
+    return slots[::-1][last], rows[::-1][last]
+
+
+def column_nanmedians(arr, cols, workers=LOAD_WORKERS):
+    """NaN-ignoring medians of arr[:, cols] (NaN elsewhere), column slices
+    spread over threads; bottleneck's partition-based median when installed"""
+    nanmedian = bn.nanmedian if bn is not None else np.nanmedian
+    med = np.full(arr.shape[1], np.nan, dtype=arr.dtype)
+    slices = [part for part in np.array_split(cols, workers) if len(part)]
+    with ThreadPoolExecutor(max_workers=max(len(slices), 1)) as pool:
+        for part, values in zip(slices, pool.map(lambda c: nanmedian(arr[:, c], axis=0), slices)):
+            med[part] = values
+    return med
+
+
+def fit_scale_inplace(X_train, X_test, block=4096, fit_rows=SCALER_FIT_ROWS):
+    """StandardScaler fit + transform in place; the statistics come from one
+    pass over at most `fit_rows` random training rows. Returns {'mean', 'scale'}"""
+    # A 50k-row random subset pins mean/std of 80 features just as well as
+    # the full split; sorted indices keep the gather sequential
+    fit = X_train
+    if fit_rows and len(X_train) > fit_rows:
+        idx = np.random.default_rng(42).choice(len(X_train), size=fit_rows, replace=False)
+        fit = X_train[np.sort(idx)]
+    
+    # Per-block mean/M2 merged with Chan's update (stable in float64)
+    n = 0
+    mean = np.zeros(fit.shape[1])
+    m2 = np.zeros(fit.shape[1])
+    for lo in range(0, len(fit), block):
+        rows = fit[lo:lo + block]
+        nb = len(rows)
+        mb = rows.mean(axis=0, dtype=np.float64)
+        m2b = ((rows - mb) ** 2).sum(axis=0)
+        delta = mb - mean
+        mean += delta * (nb / (n + nb))
+        m2 += m2b + delta ** 2 * (n * nb / (n + nb))
+        n += nb
+    
+    scale = np.sqrt(m2 / n)
+    scale[scale == 0] = 1.0  # constant features pass through, as in sklearn
+    
+    m, inv = mean.astype(X_train.dtype), (1.0 / scale).astype(X_train.dtype)
+    for X in (X_train, X_test):
+        for lo in range(0, len(X), block):
+            rows = X[lo:lo + block]
+            rows -= m
+            rows *= inv
+    
+    return {'mean': mean, 'scale': scale}
+
+
 class CICIDS2017Preprocessor:
     """Process CIC-IDS2017 efficiently"""
     
     def __init__(self, sample_size=500000):
         self.sample_size = sample_size
-        self.scaler = StandardScaler()
-        self.label_encoder = LabelEncoder()
+        self.scaler = None  # {'mean', 'scale'} of the training features
+        self.class_names = None  # sorted labels; encoded label i is class_names[i]
         
         print(f"{Fore.CYAN}{'='*60}")
         print(f"{Fore.CYAN}CIC-IDS2017 PREPROCESSOR")
@@ -32,7 +274,7 @@ class CICIDS2017Preprocessor:
         """Load CIC-IDS2017 data"""
         print(f"{Fore.YELLOW}Loading CIC-IDS2017 data...\n")
         
-        data_dir = Path('data/raw/cicids2017')
+        data_dir = RAW_DIR
         csv_files = sorted(data_dir.glob("*.csv"))
         
         if not csv_files:
@@ -45,40 +287,60 @@ class CICIDS2017Preprocessor:
             print(f"  • {f.name}: {size_mb:.1f} MB")
         print()
         
-        # Load all files
+        # Stream every file in chunks. With a sample size, rows go through a
+        # reservoir (Algorithm R), so only sample_size rows are ever kept and
+        # every row in every file is equally likely to be picked.
+        rng = np.random.default_rng(42)
+        size = self.sample_size
         dfs = []
+        reservoir = None  # column -> preallocated array of `size` values
         total_loaded = 0
         
-        for csv_file in csv_files:
-            print(f"{Fore.YELLOW}Loading {csv_file.name}...")
-            
-            try:
-                df = pd.read_csv(csv_file, encoding='utf-8', on_bad_lines='skip')
-            except:
+        # The C parser and file reads release the GIL, so later files parse
+        # on worker threads while earlier ones are being sampled
+        with ThreadPoolExecutor(max_workers=min(LOAD_WORKERS, len(csv_files))) as pool, \
+                closing(prefetch_csvs(pool, csv_files)) as files:
+            for csv_file, chunks in files:
+                print(f"{Fore.YELLOW}Loading {csv_file.name}...")
+                file_rows = 0
+                
                 try:
-                    df = pd.read_csv(csv_file, encoding='latin1', on_bad_lines='skip')
+                    for chunk in chunks:
+                        # Clean column names
+                        chunk.columns = chunk.columns.str.strip()
+                        
+                        if not size:
+                            dfs.append(chunk)
+                        else:
+                            if reservoir is None:
+                                reservoir = {
+                                    col: np.empty(size, dtype=np.uint64 if col == STRING_KEY
+                                                  else np.float64 if is_numeric_dtype(chunk[col]) else object)
+                                    for col in chunk.columns
+                                }
+                            chunk = chunk.reindex(columns=list(reservoir))
+                            slots, rows = reservoir_slots(rng, total_loaded, len(chunk), size)
+                            for col, values in reservoir.items():
+                                column = chunk[col]
+                                if values.dtype != object and not is_numeric_dtype(column):
+                                    column = pd.to_numeric(column, errors='coerce')
+                                values[slots] = column.to_numpy()[rows]
+                        
+                        file_rows += len(chunk)
+                        total_loaded += len(chunk)
                 except Exception as e:
                     print(f"{Fore.RED}  ✗ Failed to load: {e}")
                     continue
-            
-            # Clean column names
-            df.columns = df.columns.str.strip()
-            
-            dfs.append(df)
-            total_loaded += len(df)
-            print(f"{Fore.GREEN}  ✓ Loaded {len(df):,} records (Total: {total_loaded:,})")
-            
-            if self.sample_size and total_loaded >= self.sample_size * 1.5:
-                break
-        
-        # Combine
-        print(f"\n{Fore.YELLOW}Combining datasets...")
-        self.df = pd.concat(dfs, ignore_index=True)
-        
-        # Sample if needed
-        if self.sample_size and len(self.df) > self.sample_size:
-            print(f"{Fore.YELLOW}Sampling {self.sample_size:,} records...")
-            self.df = self.df.sample(n=self.sample_size, random_state=42)
+                
+                print(f"{Fore.GREEN}  ✓ Loaded {file_rows:,} records (Total: {total_loaded:,})")
+        
+        if size:
+            kept = min(total_loaded, size)
+            print(f"\n{Fore.YELLOW}Sampled {kept:,} of {total_loaded:,} records...")
+            self.df = pd.DataFrame({col: values[:kept] for col, values in (reservoir or {}).items()})
+        else:
+            print(f"\n{Fore.YELLOW}Combining datasets...")
+            self.df = pd.concat(dfs, ignore_index=True)
         
         print(f"{Fore.GREEN}✅ Total: {len(self.df):,} records, {len(self.df.columns)} columns\n")
     
@@ -96,6 +358,16 @@ class CICIDS2017Preprocessor:
         self.label_col = label_cols[0]
         print(f"{Fore.CYAN}Label column: '{self.label_col}'")
         
+        # CIC-IDS2017 pads some labels (' BENIGN'), which would split a class
+        # in two. Trim the distinct values only and keep the column categorical,
+        # categories sorted so the codes match LabelEncoder's
+        labels = self.df[self.label_col].astype('category')
+        names = np.asarray(labels.cat.categories.astype(str).str.strip(), dtype=object)
+        classes, remap = np.unique(names, return_inverse=True)
+        codes = labels.cat.codes.to_numpy()
+        codes = np.where(codes >= 0, remap[codes], -1)
+        self.df[self.label_col] = pd.Categorical.from_codes(codes, classes)
+
         # Show distribution
         print(f"\n{Fore.CYAN}Attack distribution:")
         label_counts = self.df[self.label_col].value_counts()
@@ -104,25 +376,33 @@ class CICIDS2017Preprocessor:
             print(f"  {str(label)[:30]:30s}: {count:7,} ({pct:5.1f}%)")
         print()
         
-        # Remove duplicates
+        # Remove duplicates by a 64-bit hash per row, one vectorized pass over
+        # the columns instead of comparing row tuples
         before = len(self.df)
-        self.df = self.df.drop_duplicates()
+        fingerprint = pd.util.hash_pandas_object(self.df, index=False)
+        self.df = self.df[~fingerprint.duplicated().to_numpy()]
         if before > len(self.df):
             print(f"  ✓ Removed {before - len(self.df):,} duplicates")
         
         # Get numerical columns only
-        numerical_cols = self.df.select_dtypes(include=[np.number]).columns.tolist()
-        
-        # Handle infinite/missing
-        for col in numerical_cols:
-            # Infinite
-            inf_mask = np.isinf(self.df[col])
-            if inf_mask.any():
-                self.df.loc[inf_mask, col] = self.df.loc[~inf_mask, col].max()
-            
-            # Missing
-            if self.df[col].isnull().any():
-                self.df[col].fillna(self.df[col].median(), inplace=True)
+        numerical_cols = [c for c in self.df.select_dtypes(include=[np.number]).columns if c != STRING_KEY]
+        
+        # Handle infinite/missing in one pass over the whole matrix
+        arr = self.df[numerical_cols].to_numpy(dtype=np.float32, copy=True)
+        
+        # Infinite -> largest finite value in the column
+        inf_mask = np.isinf(arr)
+        if inf_mask.any():
+            col_max = np.nanmax(np.where(inf_mask, np.nan, arr), axis=0)
+            arr[inf_mask] = col_max[np.nonzero(inf_mask)[1]]
+        
+        # Missing -> column median
+        nan_mask = np.isnan(arr)
+        if nan_mask.any():
+            col_med = column_nanmedians(arr, np.flatnonzero(nan_mask.any(axis=0)))
+            arr[nan_mask] = col_med[np.nonzero(nan_mask)[1]]
+        
+        self.df[numerical_cols] = arr
         
         # Keep only numerical + label
         cols_to_keep = numerical_cols + [self.label_col]
@@ -134,28 +414,30 @@ class CICIDS2017Preprocessor:
         """Prepare train/test"""
         print(f"{Fore.YELLOW}Preparing for ML...\n")
         
-        X = self.df.drop(columns=[self.label_col]).values
-        y_text = self.df[self.label_col].values
+        X = self.df.drop(columns=[self.label_col]).to_numpy(dtype=np.float32)
         
-        # Encode labels
-        y = self.label_encoder.fit_transform(y_text)
+        # Encode labels: one hash-table pass, codes ordered like LabelEncoder's
+        y, classes = pd.factorize(self.df[self.label_col], sort=True)
+        self.class_names = np.asarray(classes)
         
-        print(f"{Fore.CYAN}Classes ({len(self.label_encoder.classes_)}):")
-        for i, cls in enumerate(self.label_encoder.classes_):
-            count = (y == i).sum()
+        print(f"{Fore.CYAN}Classes ({len(self.class_names)}):")
+        for i, (cls, count) in enumerate(zip(self.class_names, np.bincount(y))):
             pct = (count / len(y)) * 100
             print(f"  {i}: {str(cls)[:25]:25s} {count:7,} ({pct:5.1f}%)")
         
         # Split
         print(f"\n{Fore.YELLOW}Splitting...")
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=test_size, random_state=42, stratify=y
-        )
+        # Stratified indices only; each split is gathered from X exactly once
+        # and X is released before scaling
+        sss = StratifiedShuffleSplit(n_splits=1, test_size=test_size, random_state=42)
+        (train_idx, test_idx), = sss.split(np.zeros(len(y)), y)
+        X_train, X_test = X[train_idx], X[test_idx]
+        y_train, y_test = y[train_idx], y[test_idx]
+        del X
         
         # Scale
         print(f"{Fore.YELLOW}Scaling...")
-        X_train_scaled = self.scaler.fit_transform(X_train)
-        X_test_scaled = self.scaler.transform(X_test)
+        self.scaler = fit_scale_inplace(X_train, X_test)
         
         feature_names = [c for c in self.df.columns if c != self.label_col]
         
@@ -164,7 +446,7 @@ class CICIDS2017Preprocessor:
         print(f"   Train: {len(X_train):,}")
         print(f"   Test: {len(X_test):,}\n")
         
-        return X_train_scaled, X_test_scaled, y_train, y_test, feature_names
+        return X_train, X_test, y_train, y_test, feature_names
     
     def save_processed_data(self, X_train, X_test, y_train, y_test, 
                           features, output_dir='data/processed'):
@@ -174,16 +456,17 @@ class CICIDS2017Preprocessor:
         out = Path(output_dir)
         out.mkdir(parents=True, exist_ok=True)
         
-        np.save(out / 'X_train.npy', X_train)
-        np.save(out / 'X_test.npy', X_test)
-        np.save(out / 'y_train.npy', y_train)
-        np.save(out / 'y_test.npy', y_test)
+        # One archive, float32 features, smallest label dtype; uncompressed
+        # so DataLoader can memory-map each member in place
+        label_dtype = np.int8 if len(self.class_names) <= 127 else np.int16
+        np.savez(out / 'data.npz',
+                 X_train=X_train.astype(np.float32, copy=False),
+                 X_test=X_test.astype(np.float32, copy=False),
+                 y_train=y_train.astype(label_dtype, copy=False),
+                 y_test=y_test.astype(label_dtype, copy=False))
         
-        with open(out / 'scaler.pkl', 'wb') as f:
-            pickle.dump(self.scaler, f)
-        
-        with open(out / 'label_encoder.pkl', 'wb') as f:
-            pickle.dump(self.label_encoder, f)
+        # Scaler state only; class names are stored in metadata.json
+        np.savez(out / 'scaler.npz', **self.scaler)
         
         with open(out / 'feature_names.json', 'w') as f:
             json.dump(features, f, indent=2)
@@ -191,8 +474,8 @@ class CICIDS2017Preprocessor:
         metadata = {
             'dataset': 'CIC-IDS2017',
             'n_features': len(features),
-            'n_classes': len(self.label_encoder.classes_),
-            'class_names': self.label_encoder.classes_.tolist(),
+            'n_classes': len(self.class_names),
+            'class_names': self.class_names.tolist(),
             'train_samples': len(X_train),
             'test_samples': len(X_test)
         }
@@ -202,10 +485,54 @@ class CICIDS2017Preprocessor:
         
         print(f"{Fore.GREEN}✅ Saved to: {out}\n")
     
+    def _cache_paths(self):
+        """Parquet snapshot and its sidecar for this sample size"""
+        name = f"cicids_clean_{self.sample_size or 'full'}"
+        return CACHE_DIR / f"{name}.parquet", CACHE_DIR / f"{name}.json"
+    
+    def _cache_key(self):
+        """What the snapshot was built from; any change invalidates it"""
+        return {
+            'cache_version': CACHE_VERSION,
+            'sample_size': self.sample_size,
+            'csv_mtimes': {f.name: f.stat().st_mtime_ns for f in sorted(RAW_DIR.glob("*.csv"))}
+        }
+    
+    def load_cached(self):
+        """Load the cleaned frame from a matching snapshot; False if there is none"""
+        cache, sidecar = self._cache_paths()
+        if pacsv is None or not cache.exists() or not sidecar.exists():
+            return False
+        
+        with open(sidecar) as f:
+            meta = json.load(f)
+        key = self._cache_key()
+        if {k: meta.get(k) for k in key} != key:
+            print(f"{Fore.YELLOW}Cached snapshot is stale, re-reading CSVs\n")
+            return False
+        
+        self.df = pd.read_parquet(cache, engine='pyarrow')
+        self.label_col = meta['label_col']
+        print(f"{Fore.GREEN}✅ Loaded cleaned data from {cache}: {self.df.shape}\n")
+        return True
+    
+    def save_cached(self):
+        """Snapshot the cleaned frame so re-runs skip CSV parsing (needs pyarrow)"""
+        if pacsv is None:
+            return
+        
+        cache, sidecar = self._cache_paths()
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        self.df.to_parquet(cache, engine='pyarrow', compression='zstd', index=False)
+        with open(sidecar, 'w') as f:
+            json.dump({**self._cache_key(), 'label_col': self.label_col}, f, indent=2)
+    
     def run(self):
         """Run full pipeline"""
-        self.load_data()
-        self.clean_data()
+        if not self.load_cached():
+            self.load_data()
+            self.clean_data()
+            self.save_cached()
         X_train, X_test, y_train, y_test, features = self.prepare_for_ml()
         self.save_processed_data(X_train, X_test, y_train, y_test, features)
         